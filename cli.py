@@ -1,35 +1,113 @@
+import atexit
+import csv
 import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import os
-from database import DatabaseManager
+from database import DatabaseManager, HANDLE_KEYS, PLATFORMS
 from config import Config
 import uuid
-import pandas as pd
-from utils import save_to_csv
-from fetchers.twitter_fetcher import TwitterFetcher
-from fetchers.youtube_fetcher import YoutubeFetcher
-from fetchers.instagram_fetcher import InstagramFetcher
-from fetchers.tiktok_fetcher import TiktokFetcher
+from utils import SESSION_TS
+
+# Rows written per batch when exporting a history to CSV
+HISTORY_CSV_CHUNK_SIZE = 10_000
+
+_db_instance = None
+
+def get_db() -> DatabaseManager:
+    """Return the DatabaseManager shared by all CLI commands"""
+    global _db_instance
+    if _db_instance is None:
+        _db_instance = DatabaseManager()
+    return _db_instance
+
+def get_fetcher_classes() -> dict:
+    """
+    Return the fetcher class for each supported platform
+
+    Fetchers are imported on first use so that commands which never fetch
+    (e.g. --edit_user) don't pay for loading them at startup.
+    """
+    from fetchers.twitter_fetcher import TwitterFetcher
+    from fetchers.youtube_fetcher import YoutubeFetcher
+    from fetchers.instagram_fetcher import InstagramFetcher
+    from fetchers.tiktok_fetcher import TiktokFetcher
+
+    return {
+        'twitter': TwitterFetcher,
+        'youtube': YoutubeFetcher,
+        'instagram': InstagramFetcher,
+        'tiktok': TiktokFetcher
+    }
 
 def setup_logging():
+    # Handlers run on a background listener thread so that logging calls in the
+    # fetch loops only enqueue records instead of blocking on file/console I/O
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler('app.log', delay=True),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('app.log'),
-            logging.StreamHandler()
-        ]
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
     return logging.getLogger(__name__)
 
-def save_to_csv(data: dict, platform: str, username: str):
-    """Save API response to CSV"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    os.makedirs('raw-data', exist_ok=True)
-    
-    filename = f'raw-data/{platform}_{username}_{timestamp}.csv'
-    pd.DataFrame([data]).to_csv(filename, index=False)
-    logging.info(f"Saved raw data to {filename}")
+def run_fetchers(tasks: list, method: str, description: str):
+    """
+    Run one fetcher call per platform concurrently
+
+    Args:
+        tasks: List of (platform name, fetcher, user_data) tuples
+        method: Fetcher method to call with user_data, e.g. 'fetch_user'
+        description: What is being fetched, used in log messages
+    """
+    logger = logging.getLogger(__name__)
+    if not tasks:
+        return
+
+    # Each call is a blocking HTTP request, so threads overlap the network waits
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {
+            executor.submit(getattr(fetcher, method), user_data): (name, user_data)
+            for name, fetcher, user_data in tasks
+        }
+        for future in as_completed(futures):
+            name, user_data = futures[future]
+            try:
+                future.result()
+                logger.info(f"Successfully fetched {name} {description} for {user_data['handle']}")
+            except Exception as e:
+                logger.error(f"Error fetching {name} {description}: {str(e)}")
+
+def select_option(options: list, prompt: str):
+    """
+    Prompt for a 1-based choice from a list of options
+
+    A single option is selected without prompting.
+    """
+    if len(options) == 1:
+        return options[0]
+
+    while True:
+        choice = input(prompt).strip()
+        if not choice.isdigit():
+            print("Please enter a number")
+        elif 1 <= int(choice) <= len(options):
+            return options[int(choice) - 1]
+        else:
+            print("Invalid choice")
 
 def prompt_handle(platform: str, same_handle: bool = False, previous_handle: str = None) -> str:
     """Prompt for social media handle"""
@@ -50,7 +128,7 @@ def prompt_handle(platform: str, same_handle: bool = False, previous_handle: str
 
 def add_influencer():
     """Interactive CLI to add a new influencer"""
-    db = DatabaseManager()
+    db = get_db()
     logger = logging.getLogger(__name__)
     
     name = input("Enter influencer name: ").strip()
@@ -59,8 +137,7 @@ def add_influencer():
         return
 
     # Get first handle
-    platforms = ['twitter', 'youtube', 'instagram', 'tiktok', 'facebook']
-    first_platform = platforms[0]
+    first_platform, first_handle_key = HANDLE_KEYS[0]
     first_handle = prompt_handle(first_platform)
     
     # Ask if same handle for all platforms
@@ -72,25 +149,26 @@ def add_influencer():
     # Build handles dict
     handles = {}
     if first_handle:
-        handles[f"{first_platform}_handle"] = first_handle
+        handles[first_handle_key] = first_handle
     
     # Get remaining handles
-    for platform in platforms[1:]:
+    for platform, handle_key in HANDLE_KEYS[1:]:
         handle = prompt_handle(platform, same_handle, first_handle)
         if handle:
-            handles[f"{platform}_handle"] = handle
+            handles[handle_key] = handle
 
     if not handles:
         logger.error("At least one social media handle is required")
         return
 
     # Create influencer data
+    now = datetime.utcnow()
     influencer_data = {
         'id': str(uuid.uuid4()),
         'name': name,
         'active': True,
-        'created_at': datetime.utcnow(),
-        'updated_at': datetime.utcnow(),
+        'created_at': now,
+        'updated_at': now,
         **handles
     }
 
@@ -100,49 +178,16 @@ def add_influencer():
         logger.info(f"Successfully added influencer: {name}")
         
         # Then fetch historical data for each platform
-        if handles.get('twitter_handle'):
-            try:
-                twitter_fetcher = TwitterFetcher()
-                twitter_fetcher.fetch_user_history({
+        handle_keys = dict(HANDLE_KEYS)
+        tasks = []
+        for platform, fetcher_class in get_fetcher_classes().items():
+            handle_key = handle_keys[platform]
+            if handles.get(handle_key):
+                tasks.append((fetcher_class.DISPLAY_NAME, fetcher_class(db), {
                     'id': influencer_data['id'],
-                    'handle': handles['twitter_handle']
-                })
-                logger.info(f"Successfully fetched Twitter history for {handles['twitter_handle']}")
-            except Exception as e:
-                logger.error(f"Error fetching Twitter history: {str(e)}")
-
-        if handles.get('youtube_handle'):
-            try:
-                youtube_fetcher = YoutubeFetcher()
-                youtube_fetcher.fetch_user_history({
-                    'id': influencer_data['id'],
-                    'handle': handles['youtube_handle']
-                })
-                logger.info(f"Successfully fetched YouTube history for {handles['youtube_handle']}")
-            except Exception as e:
-                logger.error(f"Error fetching YouTube history: {str(e)}")
-
-        if handles.get('instagram_handle'):
-            try:
-                instagram_fetcher = InstagramFetcher()
-                instagram_fetcher.fetch_user_history({
-                    'id': influencer_data['id'],
-                    'handle': handles['instagram_handle']
-                })
-                logger.info(f"Successfully fetched Instagram history for {handles['instagram_handle']}")
-            except Exception as e:
-                logger.error(f"Error fetching Instagram history: {str(e)}")
-
-        if handles.get('tiktok_handle'):
-            try:
-                tiktok_fetcher = TiktokFetcher()
-                tiktok_fetcher.fetch_user_history({
-                    'id': influencer_data['id'],
-                    'handle': handles['tiktok_handle']
-                })
-                logger.info(f"Successfully fetched TikTok history for {handles['tiktok_handle']}")
-            except Exception as e:
-                logger.error(f"Error fetching TikTok history: {str(e)}")
+                    'handle': handles[handle_key]
+                }))
+        run_fetchers(tasks, 'fetch_user_history', 'history')
                 
     except ValueError as e:
         logger.error(str(e))
@@ -151,7 +196,7 @@ def add_influencer():
 
 def edit_influencer():
     """Interactive CLI to edit an existing influencer"""
-    db = DatabaseManager()
+    db = get_db()
     logger = logging.getLogger(__name__)
     
     # List active influencers
@@ -165,29 +210,18 @@ def edit_influencer():
         print(f"{i}. {inf['name']}")
     
     # Select influencer
-    while True:
-        try:
-            choice = int(input("\nSelect influencer number: "))
-            if 1 <= choice <= len(influencers):
-                influencer = influencers[choice - 1]
-                break
-            print("Invalid choice")
-        except ValueError:
-            print("Please enter a number")
+    influencer = select_option(influencers, "\nSelect influencer number: ")
     
     # Show current handles
     print(f"\nCurrent handles for {influencer['name']}:")
-    platforms = ['twitter', 'youtube', 'instagram', 'tiktok', 'facebook']
-    for platform in platforms:
-        handle_key = f"{platform}_handle"
-        current = influencer.get(handle_key, 'Not set')
+    for platform in PLATFORMS:
+        current = influencer['handles'].get(platform, 'Not set')
         print(f"{platform.title()}: {current}")
     
     # Update handles
     updates = {}
     print("\nEnter new handles (press Enter to keep current):")
-    for platform in platforms:
-        handle_key = f"{platform}_handle"
+    for platform, handle_key in HANDLE_KEYS:
         while True:
             new_handle = input(f"{platform.title()}: ").strip()
             if not new_handle:
@@ -216,7 +250,7 @@ def edit_influencer():
 
 def fetch_user_history():
     """Interactive CLI to fetch history for a specific influencer"""
-    db = DatabaseManager()
+    db = get_db()
     logger = logging.getLogger(__name__)
     
     # List active influencers
@@ -230,19 +264,10 @@ def fetch_user_history():
         print(f"{i}. {inf['name']}")
     
     # Select influencer
-    while True:
-        try:
-            choice = int(input("\nSelect influencer number: "))
-            if 1 <= choice <= len(influencers):
-                influencer = influencers[choice - 1]
-                break
-            print("Invalid choice")
-        except ValueError:
-            print("Please enter a number")
+    influencer = select_option(influencers, "\nSelect influencer number: ")
     
     # Show available platforms for the influencer
-    platforms = ['twitter', 'youtube', 'instagram', 'tiktok', 'facebook']
-    available_platforms = [p for p in platforms if p in influencer.get('handles', {})]
+    available_platforms = [p for p in PLATFORMS if p in influencer.get('handles', {})]
     
     if not available_platforms:
         logger.error(f"No social media handles found for {influencer['name']}")
@@ -254,29 +279,15 @@ def fetch_user_history():
         print(f"{i}. {platform.title()} ({handle})")
     
     # Select platform
-    while True:
-        try:
-            choice = int(input("\nSelect platform number: "))
-            if 1 <= choice <= len(available_platforms):
-                selected_platform = available_platforms[choice - 1]
-                break
-            print("Invalid choice")
-        except ValueError:
-            print("Please enter a number")
+    selected_platform = select_option(available_platforms, "\nSelect platform number: ")
     
     try:
         # Initialize appropriate fetcher
-        fetchers = {
-            'twitter': TwitterFetcher(),
-            'youtube': YoutubeFetcher(),
-            'instagram': InstagramFetcher(),
-            'tiktok': TiktokFetcher()
-        }
-        
-        fetcher = fetchers.get(selected_platform)
-        if not fetcher:
+        fetcher_class = get_fetcher_classes().get(selected_platform)
+        if not fetcher_class:
             logger.error(f"Fetcher not implemented for {selected_platform}")
             return
+        fetcher = fetcher_class(db)
             
         # Prepare user data for fetcher
         user_data = {
@@ -292,11 +303,14 @@ def fetch_user_history():
             return
         
         # Save to CSV
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"history_{selected_platform}_{user_data['handle']}_{timestamp}.csv"
+        filename = f"history_{selected_platform}_{user_data['handle']}_{SESSION_TS}.csv"
         
-        df = pd.DataFrame(history)
-        df.to_csv(filename, index=False)
+        # Write in slices so no second full copy of the history is built
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.DictWriter(f, fieldnames=list(history[0].keys()))
+            writer.writeheader()
+            for start in range(0, len(history), HISTORY_CSV_CHUNK_SIZE):
+                writer.writerows(history[start:start + HISTORY_CSV_CHUNK_SIZE])
         logger.info(f"Successfully exported history to {filename}")
         
     except Exception as e:
@@ -304,7 +318,7 @@ def fetch_user_history():
 
 def fetch_user_metrics():
     """Interactive CLI to fetch current metrics for a specific user"""
-    db = DatabaseManager()
+    db = get_db()
     logger = logging.getLogger(__name__)
     
     # List active influencers
@@ -318,57 +332,14 @@ def fetch_user_metrics():
         print(f"{i}. {inf['name']}")
     
     # Select influencer
-    while True:
-        try:
-            choice = int(input("\nSelect influencer number: "))
-            if 1 <= choice <= len(influencers):
-                influencer = influencers[choice - 1]
-                break
-            print("Invalid choice")
-        except ValueError:
-            print("Please enter a number")
+    influencer = select_option(influencers, "\nSelect influencer number: ")
     
     # Fetch metrics for each available platform
-    if 'twitter' in influencer.get('handles', {}):
-        try:
-            twitter_fetcher = TwitterFetcher()
-            twitter_fetcher.fetch_user({
-                'id': influencer['id'],
-                'handle': influencer['handles']['twitter']
-            })
-            logger.info(f"Successfully processed Twitter metrics for {influencer['handles']['twitter']}")
-        except Exception as e:
-            logger.error(f"Error fetching Twitter metrics: {str(e)}")
-
-    if 'instagram' in influencer.get('handles', {}):
-        try:
-            instagram_fetcher = InstagramFetcher()
-            instagram_fetcher.fetch_user({
-                'id': influencer['id'],
-                'handle': influencer['handles']['instagram']
-            })
-            logger.info(f"Successfully processed Instagram metrics for {influencer['handles']['instagram']}")
-        except Exception as e:
-            logger.error(f"Error fetching Instagram metrics: {str(e)}")
-
-    if 'tiktok' in influencer.get('handles', {}):
-        try:
-            tiktok_fetcher = TiktokFetcher()
-            tiktok_fetcher.fetch_user({
-                'id': influencer['id'],
-                'handle': influencer['handles']['tiktok']
-            })
-            logger.info(f"Successfully processed TikTok metrics for {influencer['handles']['tiktok']}")
-        except Exception as e:
-            logger.error(f"Error fetching TikTok metrics: {str(e)}")
-
-    if 'youtube' in influencer.get('handles', {}):
-        try:
-            youtube_fetcher = YoutubeFetcher()
-            youtube_fetcher.fetch_user({
+    tasks = []
+    for platform, fetcher_class in get_fetcher_classes().items():
+        if platform in influencer.get('handles', {}):
+            tasks.append((fetcher_class.DISPLAY_NAME, fetcher_class(db), {
                 'id': influencer['id'],
-                'handle': influencer['handles']['youtube']
-            })
-            logger.info(f"Successfully processed YouTube metrics for {influencer['handles']['youtube']}")
-        except Exception as e:
-            logger.error(f"Error fetching YouTube metrics: {str(e)}")
\ No newline at end of file
+                'handle': influencer['handles'][platform]
+            }))
+    run_fetchers(tasks, 'fetch_user', 'metrics')
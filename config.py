@@ -15,19 +15,23 @@ class Config:
     
     # Application settings
     DEV_MODE = os.getenv('DEV_MODE', 'false').lower() == 'true'
+    DEV_FORMAT = os.getenv('DEV_FORMAT', 'parquet').lower()  # 'parquet' or 'csv'
+    USE_STORAGE_WRITE_API = os.getenv('USE_STORAGE_WRITE_API', 'false').lower() == 'true'
+    ENSURE_SCHEMA = os.getenv('ENSURE_SCHEMA', 'false').lower() == 'true'
+    RESPONSE_CACHE_DB = os.getenv('RESPONSE_CACHE_DB')  # SQLite file, unset to disable
+
+    REQUIRED_VARS = (
+        'SOCIALBLADE_CLIENT_ID',
+        'SOCIALBLADE_TOKEN',
+        'BIGQUERY_PROJECT_ID',
+        'BIGQUERY_DATASET',
+        'GOOGLE_CREDENTIALS_PATH'
+    )
 
     @classmethod
     def validate(cls):
         """Validate required configuration"""
-        required_vars = [
-            'SOCIALBLADE_CLIENT_ID',
-            'SOCIALBLADE_TOKEN',
-            'BIGQUERY_PROJECT_ID',
-            'BIGQUERY_DATASET',
-            'GOOGLE_CREDENTIALS_PATH'
-        ]
-        
-        missing = [var for var in required_vars if not getattr(cls, var, None)]
+        missing = [var for var in cls.REQUIRED_VARS if not getattr(cls, var)]
         
         if missing:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
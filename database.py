@@ -1,70 +1,392 @@
 from google.cloud import bigquery
-from typing import List, Dict, Optional
-import pandas as pd
+from typing import List, Dict, Optional, Tuple
 import os
+import re
 from config import Config
 import logging
 from google.api_core import retry
-from datetime import datetime
-import uuid
+from google.api_core.exceptions import GoogleAPICallError, NotFound
+from datetime import datetime, timedelta, timezone
+import threading
+import asyncio
+from collections import deque, namedtuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google.oauth2 import service_account
+from cachetools import TTLCache
+import csv
+import io
+import requests
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+try:
+    from google.cloud import bigquery_storage
+    from google.cloud.bigquery_storage_v1 import writer as storage_writer
+except ImportError:  # optional, reads fall back to the REST API
+    bigquery_storage = storage_writer = None
+
+PLATFORMS = ('twitter', 'youtube', 'instagram', 'tiktok', 'facebook')
+
+# (platform, handle column) pairs, e.g. ('twitter', 'twitter_handle')
+HANDLE_KEYS = tuple((platform, f"{platform}_handle") for platform in PLATFORMS)
+
+# An influencer's handle on one platform, as handed to BaseFetcher.fetch_all
+PlatformUser = namedtuple('PlatformUser', 'id handle')
+
+# Platform-specific metric columns as (column, fetched key, default when missing)
+PLATFORM_FIELDS = {
+    'twitter': (
+        ('influencer_handle', 'username', None),
+        ('followers', 'followers', None),
+        ('following', 'following', None),
+        ('tweets', 'tweets', None),
+        ('favorites', 'favorites', None),
+    ),
+    'youtube': (
+        ('subscribers', 'subscribers', 0),
+        ('total_views', 'total_views', 0),
+        ('videos', 'videos', 0),
+        ('engagement_rate', 'engagement_rate', 0.0),
+    ),
+    'instagram': (
+        ('followers', 'followers', 0),
+        ('following', 'following', 0),
+        ('posts', 'posts', 0),
+        ('engagement_rate', 'engagement_rate', 0.0),
+    ),
+}
+
+SCHEMA_SCRIPT = 'schema/create_tables.sql'
+
+# (project, dataset, script mtime) combinations whose DDL already ran in this process
+_ddl_done = set()
+_ddl_lock = threading.Lock()
+
+# Schema statements submitted to BigQuery at the same time
+DDL_MAX_WORKERS = 8
+
+DUPLICATE_HANDLES_MESSAGE = 'Handle(s) already exist in other accounts: '
+
+# Tables with a timestamp and influencer_id column, partitioned and clustered on them
+METRICS_TABLES = ('twitter_metrics', 'youtube_metrics', 'instagram_metrics', 'tiktok_metrics')
+
+# Writes of up to this many rows go through streaming inserts instead of a load job
+STREAMING_INSERT_MAX_ROWS = 500
+
+# Larger writes are uploaded as one load job per chunk of this many rows
+LOAD_CHUNK_SIZE = 10_000
+
+# Load jobs from earlier save_influencer_data calls left running when a new call starts
+MAX_PENDING_LOAD_JOBS = 1
+
+# Arrow column types for the BigQuery field types used in the metrics tables;
+# naive datetimes are taken as UTC
+ARROW_TYPES = {
+    'STRING': pa.string(),
+    'INTEGER': pa.int64(),
+    'FLOAT': pa.float64(),
+    'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+}
+
+# Seconds a get_platform_last_updates result is reused for the same platform and ids
+LAST_UPDATES_CACHE_TTL = 60
+
+# Protobuf field types used to send rows to the Storage Write API;
+# timestamps are sent as microseconds since the epoch
+PROTO_TYPES = {
+    'STRING': descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+    'INTEGER': descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+    'FLOAT': descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+    'TIMESTAMP': descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+}
+
+# Seconds a get_active_influencers result is reused before querying again
+INFLUENCERS_CACHE_TTL = 300
+
+def _bulk_uuid4_strs(n: int) -> List[str]:
+    """Generate n random (version 4) UUID strings from a single urandom call"""
+    raw = bytearray(os.urandom(16 * n))
+    raw[6::16] = bytes((b & 0x0f) | 0x40 for b in raw[6::16])  # version 4
+    raw[8::16] = bytes((b & 0x3f) | 0x80 for b in raw[8::16])  # RFC 4122 variant
+    hexed = raw.hex()
+    return [
+        f"{hexed[i:i + 8]}-{hexed[i + 8:i + 12]}-{hexed[i + 12:i + 16]}-"
+        f"{hexed[i + 16:i + 20]}-{hexed[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+@lru_cache(maxsize=None)
+def _credentials(credentials_path: str):
+    return service_account.Credentials.from_service_account_file(credentials_path)
+
+@lru_cache(maxsize=1)
+def _shared_client(project_id: str, credentials_path: str) -> bigquery.Client:
+    """BigQuery client shared across the process; it is thread-safe"""
+    client = bigquery.Client(project=project_id, credentials=_credentials(credentials_path))
+    # The default pool keeps 10 connections, fewer than the
+    # threads that share this client when fetching in parallel
+    client._http.mount(
+        'https://',
+        requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=64)
+    )
+    return client
+
+@lru_cache(maxsize=1)
+def _shared_read_client(credentials_path: str):
+    """Storage Read API client for Arrow reads"""
+    return bigquery_storage.BigQueryReadClient(credentials=_credentials(credentials_path))
+
+@lru_cache(maxsize=1)
+def _shared_write_client(credentials_path: str):
+    """Storage Write API client, only used when Config.USE_STORAGE_WRITE_API is set"""
+    return bigquery_storage.BigQueryWriteClient(credentials=_credentials(credentials_path))
 
 class DatabaseManager:
+    # Protobuf row classes for the Storage Write API, by table id and the
+    # (name, type) of each schema field, since callers may send different
+    # column subsets to the same table
+    _proto_row_classes = {}
+    # Whether _ensure_table_layout already ran in this process
+    _layout_checked = False
+    # Whether dev_data/ was already created in this process
+    _dev_dir_ready = False
+
     def __init__(self):
         self.project_id = Config.BIGQUERY_PROJECT_ID
         self.dataset_id = Config.BIGQUERY_DATASET
         self.logger = logging.getLogger(__name__)
+        # Read caches, shared by the threads using this manager
+        self._cache_lock = threading.RLock()
+        self._influencer_cache = TTLCache(maxsize=8, ttl=INFLUENCERS_CACHE_TTL)
+        self._last_updates_cache = TTLCache(maxsize=64, ttl=LAST_UPDATES_CACHE_TTL)  # keyed by (platform, frozenset(ids))
+        self._build_queries()
+        self._pending_jobs = deque()  # (platform, load job) not yet waited on
+        # Errors of waited-on load jobs by platform, until flush() reports them
+        self._load_failures = {}
+        self._load_failures_lock = threading.Lock()
         
         try:
-            self.client = bigquery.Client(
-                project=Config.BIGQUERY_PROJECT_ID,
-                credentials=service_account.Credentials.from_service_account_file(
-                    Config.GOOGLE_CREDENTIALS_PATH
-                )
-            )
+            self.client = _shared_client(Config.BIGQUERY_PROJECT_ID, Config.GOOGLE_CREDENTIALS_PATH)
+            self.bqstorage = None
+            self.write_client = None
+            if bigquery_storage is not None and not Config.DEV_MODE:
+                self.bqstorage = _shared_read_client(Config.GOOGLE_CREDENTIALS_PATH)
+                if Config.USE_STORAGE_WRITE_API:
+                    self.write_client = _shared_write_client(Config.GOOGLE_CREDENTIALS_PATH)
             # Initialize tables after client and logger are set up
             init_database(self.client)
+            if Config.ENSURE_SCHEMA and not DatabaseManager._layout_checked:
+                self._ensure_table_layout()
+                DatabaseManager._layout_checked = True
             
         except Exception as e:
             self.logger.error(f"Failed to initialize BigQuery client: {str(e)}")
             raise
 
-    def get_active_influencers(self) -> List[Dict]:
-        """Fetch all active influencers from BigQuery"""
-        try:
+    def _build_queries(self):
+        """Build the SQL of the fixed-shape queries once, since project and dataset never change"""
+        influencers_table = f"`{self.project_id}.{self.dataset_id}.influencers`"
+
+        # Influencers without any handle are filtered out by BigQuery
+        handle_columns = ", ".join(handle_key for _, handle_key in HANDLE_KEYS)
+
+        self._active_influencers_sql = f"""
+            SELECT
+                id,
+                name,
+                {handle_columns}
+            FROM {influencers_table}
+            WHERE active = TRUE
+            AND COALESCE({handle_columns}) IS NOT NULL
+        """
 
-            query = f"""
-                SELECT 
-                    id,
-                    name,
-                    twitter_handle,
-                    instagram_handle,
-                    youtube_handle,
-                    tiktok_handle,
-                    facebook_handle
-                FROM `{self.project_id}.{self.dataset_id}.influencers`
+        # New influencers are inserted unless their id already exists; the
+        # whole batch is skipped if any handle belongs to another active influencer
+        insert_columns = ", ".join(
+            ['id', 'name'] + [handle_key for _, handle_key in HANDLE_KEYS]
+            + ['active', 'created_at', 'updated_at']
+        )
+        handle_clash = " OR ".join(
+            f"existing.{handle_key} = incoming.{handle_key}" for _, handle_key in HANDLE_KEYS
+        )
+        self._insert_influencers_sql = f"""
+            MERGE {influencers_table} t
+            USING (
+                SELECT * FROM UNNEST(@rows)
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM {influencers_table} existing, UNNEST(@rows) incoming
+                    WHERE existing.active = TRUE
+                    AND existing.id != incoming.id
+                    AND ({handle_clash})
+                )
+            ) s
+            ON t.id = s.id
+            WHEN NOT MATCHED THEN
+                INSERT ({insert_columns})
+                VALUES ({", ".join(f"s.{column}" for column in insert_columns.split(", "))})
+        """
+
+        # Latest metric across the platform metrics tables; the bounded variant
+        # filters each table on @since so only those days' partitions are
+        # scanned, with a parameter rather than CURRENT_TIMESTAMP() so results
+        # stay cacheable
+        def last_update_dates_sql(timestamp_filter: str) -> str:
+            branches = " UNION ALL ".join(f"""
+                SELECT influencer_id, timestamp
+                FROM `{self.project_id}.{self.dataset_id}.{table_name}`
+                WHERE influencer_id IN UNNEST(@influencer_ids){timestamp_filter}
+            """ for table_name in METRICS_TABLES)
+            return f"""
+                SELECT influencer_id, MAX(timestamp) as last_update
+                FROM ({branches})
+                GROUP BY influencer_id
+            """
+        self._last_update_dates_sql = last_update_dates_sql("")
+        self._recent_update_dates_sql = last_update_dates_sql(" AND timestamp >= @since")
+
+        # Per-platform queries, keyed by platform; only PLATFORMS are valid
+        self._platform_last_updates_sql = {
+            platform: f"""
+                SELECT id, last_{platform}_updated as last_update
+                FROM {influencers_table}
+                WHERE id IN UNNEST(@influencer_ids)
+                AND {platform}_handle IS NOT NULL  -- Only check if platform handle exists
+            """
+            for platform in PLATFORMS
+        }
+        # Active influencers with a handle whose platform data is older than @cutoff
+        self._stale_users_sql = {
+            platform: f"""
+                SELECT id, {platform}_handle as handle
+                FROM {influencers_table}
                 WHERE active = TRUE
+                AND {platform}_handle IS NOT NULL
+                AND (last_{platform}_updated IS NULL OR last_{platform}_updated < @cutoff)
             """
-            
-            query_job = self.client.query(query)
-            results = query_job.result()
+            for platform in PLATFORMS
+        }
+
+        self._merge_last_platform_sql = {
+            platform: f"""
+                MERGE {influencers_table} t
+                USING UNNEST(@updates) u
+                ON t.id = u.id
+                AND t.{platform}_handle IS NOT NULL  -- Only update if platform handle exists
+                WHEN MATCHED THEN UPDATE SET
+                    last_{platform}_updated = u.ts,
+                    updated_at = u.ts
+            """
+            for platform in PLATFORMS
+        }
+
+    @staticmethod
+    def _lookup_job_config(query_parameters: Optional[List] = None) -> bigquery.QueryJobConfig:
+        """
+        Job config for small read-only lookups: interactive priority, and
+        answered from BigQuery's query cache when the same query and
+        parameters ran recently against unchanged tables
+        """
+        return bigquery.QueryJobConfig(
+            query_parameters=query_parameters or [],
+            use_query_cache=True,
+            priority=bigquery.QueryPriority.INTERACTIVE
+        )
+
+    @staticmethod
+    def _platform_query(queries: Dict[str, str], platform: str) -> str:
+        """Look up a prebuilt per-platform query, rejecting unknown platforms"""
+        if platform not in queries:
+            raise ValueError(f"Unsupported platform: {platform}")
+        return queries[platform]
+
+    def _ensure_table_layout(self):
+        """
+        Rebuild metrics tables that are not yet partitioned by day of timestamp
+        and clustered by influencer_id, keeping their schema and rows
+
+        The original table is only dropped once its copy holds the same number
+        of rows. A copy left behind by a run that stopped between the drop and
+        the rename is renamed into place.
+        """
+        for table_name in METRICS_TABLES:
+            table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
+            try:
+                try:
+                    table = self.client.get_table(table_id)
+                except NotFound:
+                    try:
+                        self.client.get_table(f"{table_id}_v2")
+                    except NotFound:
+                        continue
+                    self.logger.info(f"Finishing interrupted migration of {table_id}")
+                    self.client.query(
+                        f"ALTER TABLE `{table_id}_v2` RENAME TO `{table_name}`"
+                    ).result()
+                    continue
+                if table.time_partitioning and table.clustering_fields == ['influencer_id']:
+                    continue
+
+                self.logger.info(f"Partitioning and clustering {table_id}")
+                # CREATE ... LIKE keeps column modes and defaults, unlike CREATE ... AS SELECT
+                self.client.query(f"""
+                    CREATE OR REPLACE TABLE `{table_id}_v2` LIKE `{table_id}`
+                    PARTITION BY DATE(timestamp)
+                    CLUSTER BY influencer_id;
+                    INSERT INTO `{table_id}_v2` SELECT * FROM `{table_id}`;
+                    IF (SELECT COUNT(*) FROM `{table_id}_v2`) != (SELECT COUNT(*) FROM `{table_id}`) THEN
+                        RAISE USING MESSAGE = 'Copy of {table_name} is incomplete, original kept';
+                    END IF;
+                    DROP TABLE `{table_id}`;
+                    ALTER TABLE `{table_id}_v2` RENAME TO `{table_name}`;
+                """).result()
+            except Exception as e:
+                self.logger.error(f"Error migrating {table_id}: {str(e)}")
+                raise
+
+    def get_active_influencers(self) -> List[Dict]:
+        """
+        Fetch all active influencers from BigQuery
+
+        Results are cached for INFLUENCERS_CACHE_TTL seconds; writes through
+        this manager invalidate the cache.
+        """
+        with self._cache_lock:
+            influencers = self._influencer_cache.get('active')
+            if influencers is None:
+                influencers = self._get_active_influencers_uncached()
+                self._influencer_cache['active'] = influencers
+            return list(influencers)
+
+    def _get_active_influencers_uncached(self) -> List[Dict]:
+        """Query the active influencers and their handles"""
+        try:
+            query_job = self.client.query(self._active_influencers_sql)
+            # Read columnar results, over the Storage Read API when available
+            table = query_job.result().to_arrow(
+                bqstorage_client=self.bqstorage, create_bqstorage_client=False
+            )
             
             influencers = []
-            for row in results:
-                influencer = dict(row.items())
-                # Filter out None values
+            for influencer_id, name, *row_handles in zip(
+                table.column('id').to_pylist(),
+                table.column('name').to_pylist(),
+                *(table.column(handle_key).to_pylist() for _, handle_key in HANDLE_KEYS)
+            ):
                 handles = {
-                    platform: handle for platform, handle in {
-                        'twitter': influencer.get('twitter_handle'),
-                        'instagram': influencer.get('instagram_handle'),
-                        'youtube': influencer.get('youtube_handle'),
-                        'tiktok': influencer.get('tiktok_handle'),
-                        'facebook': influencer.get('facebook_handle')
-                    }.items() if handle
+                    platform: handle
+                    for (platform, _), handle in zip(HANDLE_KEYS, row_handles)
+                    if handle
                 }
                 if handles:  # Only include influencers with at least one handle
-                    influencer['handles'] = handles
-                    influencers.append(influencer)
+                    influencers.append({
+                        'id': influencer_id,
+                        'name': name,
+                        'handles': handles
+                    })
             
             self.logger.info(f"Fetched {len(influencers)} active influencers")
             return influencers
@@ -73,70 +395,70 @@ class DatabaseManager:
             self.logger.error(f"Error fetching influencers: {str(e)}")
             raise
 
+    def invalidate_influencers_cache(self):
+        """Drop the cached get_active_influencers result"""
+        with self._cache_lock:
+            self._influencer_cache.clear()
+
     def save_influencer_data(self, platform: str, data: List[Dict]):
+        """
+        Save fetched metrics for a platform
+
+        Batches that go through load jobs return once the jobs are submitted;
+        older jobs are waited on at the start of the next call, and flush()
+        waits for all of them and reports the ones that failed.
+        """
+        if data:
+            # Earlier load jobs may keep running alongside this call, up to a limit
+            self._wait_pending_jobs(keep=MAX_PENDING_LOAD_JOBS)
+        self._save_platform_data(platform, data)
+
+    def _save_platform_data(self, platform: str, data: List[Dict]):
+        """save_influencer_data without waiting on earlier load jobs first"""
         try:
             if not data:
                 self.logger.warning(f"No data to save for platform: {platform}")
                 return
 
-            # In dev_mode, also save to CSV but continue with normal operation
-            if Config.DEV_MODE:
-                self._save_to_csv(platform, data)
-
-            # Normal BigQuery save
-            metrics_data = []
             table_id = f"{self.project_id}.{self.dataset_id}.{platform}_metrics"
-            
-            for item in data:
-                metric = {
-                    'id': str(uuid.uuid4()),
-                    'influencer_id': item.get('influencer_id'),
-                    'timestamp': item.get('timestamp') or datetime.utcnow(),
-                    'created_at': datetime.utcnow()
-                }
-                
-                # Add platform-specific fields with proper NULL handling
-                if platform == 'twitter':
-                    metric.update({
-                        'influencer_handle': item.get('username'),
-                        'followers': item.get('followers'),
-                        'following': item.get('following'),
-                        'tweets': item.get('tweets'),
-                        'favorites': item.get('favorites')
-                    })
-                elif platform == 'youtube':
-                    metric.update({
-                        'subscribers': item.get('subscribers', 0),
-                        'total_views': item.get('total_views', 0),
-                        'videos': item.get('videos', 0),
-                        'engagement_rate': item.get('engagement_rate', 0.0)
-                    })
-                elif platform == 'instagram':
-                    metric.update({
-                        'followers': item.get('followers', 0),
-                        'following': item.get('following', 0),
-                        'posts': item.get('posts', 0),
-                        'engagement_rate': item.get('engagement_rate', 0.0)
-                    })
-                
-                metrics_data.append(metric)
+            now = datetime.utcnow()
 
-            df = pd.DataFrame(metrics_data)
-            
-            # Define schema to ensure proper data types
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=self._get_metrics_schema(platform)
-            )
+            # In dev_mode, also save to CSV but continue with normal operation;
+            # the dump holds exactly the rows that are written to BigQuery
+            transformed = None
+            if Config.DEV_MODE:
+                transformed = self._transform_rows(platform, data, now)
+                self._save_to_csv(platform, transformed)
 
-            @retry.Retry(predicate=retry.if_transient_error)
-            def load_table():
-                job = self.client.load_table_from_dataframe(
-                    df, table_id, job_config=job_config
-                )
-                return job.result()
+            def rows_for(start: int, stop: int) -> List[Dict]:
+                if transformed is not None:
+                    return transformed[start:stop]
+                return self._transform_rows(platform, data[start:stop], now)
 
-            load_table()
+            def table_for(start: int, stop: int) -> pa.Table:
+                if transformed is not None:
+                    return self._to_arrow_table(transformed[start:stop], schema)
+                return self._metrics_arrow_table(platform, data[start:stop], now, schema)
+
+            # Define schema to ensure proper data types
+            schema = self._get_metrics_schema(platform)
+
+            # Small batches skip the fixed cost of scheduling a load job
+            if self.write_client is not None and len(data) <= LOAD_CHUNK_SIZE:
+                self._append_rows(table_id, rows_for(0, len(data)), schema)
+            elif len(data) <= STREAMING_INSERT_MAX_ROWS:
+                self._stream_rows(table_id, rows_for(0, len(data)), schema)
+            else:
+                # Only one chunk's rows and Parquet buffer are held at a time;
+                # the load jobs run server-side while later chunks are uploaded
+                for start in range(0, len(data), LOAD_CHUNK_SIZE):
+                    table = table_for(start, start + LOAD_CHUNK_SIZE)
+                    self._pending_jobs.append((platform, self._start_parquet_load(table_id, table, schema)))
+                    del table
+                    self.logger.info(f"Uploaded {min(start + LOAD_CHUNK_SIZE, len(data))}/{len(data)} records for {platform}")
+
+                self.logger.info(f"Submitted load jobs for {len(data)} records for {platform}")
+                return
             
             self.logger.info(f"Successfully saved {len(data)} records for {platform}")
 
@@ -144,8 +466,220 @@ class DatabaseManager:
             self.logger.error(f"Error saving data for {platform}: {str(e)}")
             raise
 
-    def _get_metrics_schema(self, platform: str) -> List[bigquery.SchemaField]:
-        """Get the schema for a specific platform's metrics table"""
+    def save_influencer_data_many(self, data_by_platform: Dict[str, List[Dict]]) -> Dict[str, Exception]:
+        """
+        Save data for several platforms concurrently, one thread per platform
+
+        Returns a dict mapping each platform whose save failed to its error
+        """
+        failures = {}
+        if not data_by_platform:
+            return failures
+
+        with ThreadPoolExecutor(max_workers=len(data_by_platform)) as executor:
+            futures = {
+                executor.submit(self._save_platform_data, platform, data): platform
+                for platform, data in data_by_platform.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures[futures[future]] = e
+
+        for platform, error in self.flush().items():
+            failures.setdefault(platform, error)
+        return failures
+
+    async def save_influencer_data_async(self, platform: str, data: List[Dict]):
+        """
+        save_influencer_data run in a worker thread, so saves for several
+        platforms can be awaited together with asyncio.gather
+
+        As with the synchronous call, load jobs may still be running when
+        this returns; flush() waits for them.
+        """
+        await asyncio.to_thread(self.save_influencer_data, platform, data)
+
+    def flush(self) -> Dict[str, Exception]:
+        """
+        Wait for all load jobs submitted by save_influencer_data
+
+        Returns a dict mapping each platform whose load failed since the last
+        flush() to its error, including jobs already waited on by later saves
+        """
+        self._wait_pending_jobs(keep=0)
+        with self._load_failures_lock:
+            failures, self._load_failures = self._load_failures, {}
+        return failures
+
+    def _wait_pending_jobs(self, keep: int):
+        """
+        Wait for the oldest pending load jobs until at most `keep` remain,
+        recording failures for flush()
+        """
+        while len(self._pending_jobs) > keep:
+            try:
+                platform, job = self._pending_jobs.popleft()
+            except IndexError:  # drained by another thread
+                break
+            try:
+                job.result()
+            except Exception as e:
+                self.logger.error(f"Error loading data for {platform}: {str(e)}")
+                with self._load_failures_lock:
+                    self._load_failures.setdefault(platform, e)
+
+    def _transform_rows(self, platform: str, data: List[Dict], now: datetime) -> List[Dict]:
+        """Map fetched metrics onto rows of the platform's metrics table"""
+        fields = PLATFORM_FIELDS.get(platform, ())
+        metrics_data = []
+        for item, metric_id in zip(data, _bulk_uuid4_strs(len(data))):
+            metric = {
+                'id': metric_id,
+                'influencer_id': item.get('influencer_id'),
+                'timestamp': item.get('timestamp') or now,
+                'created_at': now
+            }
+            for column, key, default in fields:
+                metric[column] = item.get(key, default)
+            metrics_data.append(metric)
+        return metrics_data
+
+    def _metrics_arrow_table(self, platform: str, data: List[Dict], now: datetime,
+                             schema: List[bigquery.SchemaField]) -> pa.Table:
+        """
+        Build the Arrow table of _transform_rows' rows column by column,
+        without creating a dict per row
+        """
+        columns = {
+            'id': _bulk_uuid4_strs(len(data)),
+            'influencer_id': [item.get('influencer_id') for item in data],
+            'timestamp': [item.get('timestamp') or now for item in data],
+            'created_at': [now] * len(data)
+        }
+        for column, key, default in PLATFORM_FIELDS.get(platform, ()):
+            columns[column] = [item.get(key, default) for item in data]
+        return pa.table({
+            field.name: pa.array(
+                columns.get(field.name, [None] * len(data)),
+                type=ARROW_TYPES[field.field_type]
+            )
+            for field in schema
+        })
+
+    def _stream_rows(self, table_id: str, rows: List[Dict], schema: List[bigquery.SchemaField]):
+        """
+        Write rows with the streaming insert API
+
+        Only the columns present in the schema are sent. Not suitable for
+        tables that are updated with DML shortly after the insert, since
+        rows in the streaming buffer cannot be modified.
+        """
+        # insert_rows_json encodes the rows itself, so only the datetimes are
+        # converted here, to ISO 8601 strings with naive ones taken as UTC
+        timestamp_columns = {field.name for field in schema if field.field_type == 'TIMESTAMP'}
+        json_rows = []
+        for row in rows:
+            json_row = {field.name: row.get(field.name) for field in schema}
+            for column in timestamp_columns:
+                value = json_row[column]
+                if isinstance(value, datetime):
+                    if value.tzinfo is None:
+                        value = value.replace(tzinfo=timezone.utc)
+                    json_row[column] = value.isoformat()
+            json_rows.append(json_row)
+        errors = self.client.insert_rows_json(
+            table_id, json_rows, row_ids=[row['id'] for row in rows]
+        )
+        if errors:
+            raise RuntimeError(f"Streaming insert into {table_id} failed: {errors}")
+
+    def _append_rows(self, table_id: str, rows: List[Dict], schema: List[bigquery.SchemaField]):
+        """Write rows to the table's default stream with the Storage Write API"""
+        row_class = self._proto_row_class(table_id, schema)
+        project, dataset, table = table_id.split('.')
+
+        request_template = bigquery_storage.types.AppendRowsRequest(
+            write_stream=self.write_client.write_stream_path(project, dataset, table, '_default')
+        )
+        proto_descriptor = descriptor_pb2.DescriptorProto()
+        row_class.DESCRIPTOR.CopyToProto(proto_descriptor)
+        request_template.proto_rows = bigquery_storage.types.AppendRowsRequest.ProtoData(
+            writer_schema=bigquery_storage.types.ProtoSchema(proto_descriptor=proto_descriptor)
+        )
+
+        proto_rows = bigquery_storage.types.ProtoRows(
+            serialized_rows=[self._to_proto_row(row_class, row, schema) for row in rows]
+        )
+        request = bigquery_storage.types.AppendRowsRequest(
+            proto_rows=bigquery_storage.types.AppendRowsRequest.ProtoData(rows=proto_rows)
+        )
+
+        append_rows_stream = storage_writer.AppendRowsStream(self.write_client, request_template)
+        try:
+            append_rows_stream.send(request).result()
+        finally:
+            append_rows_stream.close()
+
+    @classmethod
+    def _proto_row_class(cls, table_id: str, schema: List[bigquery.SchemaField]):
+        """Build (once per table and schema) a protobuf message class mirroring the schema"""
+        cache_key = (table_id, tuple((field.name, field.field_type) for field in schema))
+        if cache_key not in cls._proto_row_classes:
+            file_proto = descriptor_pb2.FileDescriptorProto(
+                name=f"{table_id}.proto", package="metrics", syntax="proto2"
+            )
+            message_proto = file_proto.message_type.add(name="Row")
+            for number, field in enumerate(schema, start=1):
+                message_proto.field.add(
+                    name=field.name,
+                    number=number,
+                    type=PROTO_TYPES[field.field_type],
+                    label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+                )
+            pool = descriptor_pool.DescriptorPool()
+            pool.Add(file_proto)
+            cls._proto_row_classes[cache_key] = message_factory.GetMessageClass(
+                pool.FindMessageTypeByName("metrics.Row")
+            )
+        return cls._proto_row_classes[cache_key]
+
+    @staticmethod
+    def _to_proto_row(row_class, row: Dict, schema: List[bigquery.SchemaField]) -> bytes:
+        """Serialize one row, leaving NULL columns unset"""
+        message = row_class()
+        for field in schema:
+            value = row.get(field.name)
+            if value is None:
+                continue
+            if field.field_type == 'TIMESTAMP':
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=timezone.utc)
+                value = int(value.timestamp()) * 1_000_000 + value.microsecond
+            setattr(message, field.name, value)
+        return message.SerializeToString()
+
+    @staticmethod
+    def _to_arrow_table(rows: List[Dict], schema: List[bigquery.SchemaField]) -> pa.Table:
+        """Build a typed Arrow table with one column per schema field"""
+        return pa.table({
+            field.name: pa.array(
+                [row.get(field.name) for row in rows],
+                type=ARROW_TYPES[field.field_type]
+            )
+            for field in schema
+        })
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_metrics_schema(platform: str) -> Tuple[bigquery.SchemaField, ...]:
+        """
+        Get the schema for a specific platform's metrics table
+
+        Built once per platform; the shared result is a tuple so callers
+        cannot modify it.
+        """
         base_schema = [
             bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
             bigquery.SchemaField("influencer_id", "STRING", mode="REQUIRED"),
@@ -174,14 +708,34 @@ class DatabaseManager:
                 bigquery.SchemaField("posts", "INTEGER", mode="NULLABLE"),
             ])
         
-        return base_schema
+        return tuple(base_schema)
 
     def _save_to_csv(self, platform: str, data: List[Dict]):
+        """
+        Dump data to dev_data/ as Parquet (default) or CSV, per Config.DEV_FORMAT
+
+        The file is written next to its destination and then renamed over it,
+        so an interrupted dump never leaves a partial file behind.
+        """
         try:
-            df = pd.DataFrame(data)
-            os.makedirs('dev_data', exist_ok=True)
-            output_file = f'dev_data/{platform}_metrics.csv'
-            df.to_csv(output_file, index=False)
+            if not data:
+                return
+            # Union of the keys across rows, in first-seen order
+            fields = list(dict.fromkeys(key for row in data for key in row))
+            if not DatabaseManager._dev_dir_ready:
+                os.makedirs('dev_data', exist_ok=True)
+                DatabaseManager._dev_dir_ready = True
+            if Config.DEV_FORMAT == 'csv':
+                output_file = f'dev_data/{platform}_metrics.csv'
+                with open(f'{output_file}.tmp', 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writeheader()
+                    writer.writerows(data)
+            else:
+                output_file = f'dev_data/{platform}_metrics.parquet'
+                table = pa.table({field: [row.get(field) for row in data] for field in fields})
+                pq.write_table(table, f'{output_file}.tmp', compression='snappy')
+            os.replace(f'{output_file}.tmp', output_file)
             self.logger.info(f"Successfully saved {len(data)} records to {output_file}")
         except Exception as e:
             self.logger.error(f"Error saving CSV for {platform}: {str(e)}")
@@ -193,32 +747,39 @@ class DatabaseManager:
         Returns list of platforms where duplicates were found
         """
         try:
-            duplicates = []
+            handle_columns = {platform_handle for _, platform_handle in HANDLE_KEYS}
+
+            # One UNION ALL branch per non-empty handle, all checked in one query
+            query_parts = []
+            params = []
             for platform_handle, handle in handles.items():
                 if not handle:
                     continue
-                    
-                query = f"""
-                    SELECT COUNT(*) as count
+                if platform_handle not in handle_columns:
+                    raise ValueError(f"Unsupported handle field: {platform_handle}")
+
+                query_parts.append(f"""
+                    SELECT DISTINCT '{platform_handle}' as platform_handle
                     FROM `{self.project_id}.{self.dataset_id}.influencers`
-                    WHERE {platform_handle} = @handle
+                    WHERE {platform_handle} = @{platform_handle}
                     AND active = TRUE
-                """
-                
-                job_config = bigquery.QueryJobConfig(
-                    query_parameters=[
-                        bigquery.ScalarQueryParameter("handle", "STRING", handle)
-                    ]
+                """)
+                params.append(
+                    bigquery.ScalarQueryParameter(platform_handle, "STRING", handle)
                 )
-                
-                query_job = self.client.query(query, job_config=job_config)
-                result = next(query_job.result())
-                
-                if result.count > 0:
-                    platform = platform_handle.replace('_handle', '')
-                    duplicates.append(f"{platform} ({handle})")
-                    
-            return duplicates
+
+            if not query_parts:
+                return []
+
+            job_config = self._lookup_job_config(params)
+            query_job = self.client.query(" UNION ALL ".join(query_parts), job_config=job_config)
+            found = {row.platform_handle for row in query_job.result()}
+
+            return [
+                f"{platform_handle.replace('_handle', '')} ({handle})"
+                for platform_handle, handle in handles.items()
+                if platform_handle in found
+            ]
             
         except Exception as e:
             self.logger.error(f"Error checking existing handles: {str(e)}")
@@ -226,162 +787,222 @@ class DatabaseManager:
 
     def add_influencer(self, influencer_data: Dict):
         """Add a new influencer to the database"""
+        self.add_influencers([influencer_data])
+
+    def add_influencers(self, influencers: List[Dict]):
+        """
+        Add new influencers to the database
+
+        All rows are checked for duplicate handles and inserted with a single
+        MERGE, regardless of how many are passed. If any handle already
+        belongs to another active influencer nothing is inserted and a
+        ValueError is raised; rows whose id already exists are skipped.
+
+        Args:
+            influencers: List of influencer dictionaries with 'id', 'name'
+                and any of the '<platform>_handle' fields
+        """
         try:
+            if not influencers:
+                self.logger.warning("No influencers to add")
+                return
+
             if Config.DEV_MODE:
-                self._save_to_csv('influencers', [influencer_data])
+                self._save_to_csv('influencers', influencers)
 
             # Ensure all required fields are present with default values
-            complete_data = {
-                'id': influencer_data['id'],
-                'name': influencer_data['name'],
-                'twitter_handle': influencer_data.get('twitter_handle'),
-                'instagram_handle': influencer_data.get('instagram_handle'),
-                'youtube_handle': influencer_data.get('youtube_handle'),
-                'tiktok_handle': influencer_data.get('tiktok_handle'),
-                'facebook_handle': influencer_data.get('facebook_handle'),
-                'last_twitter_updated': None,
-                'last_instagram_updated': None,
-                'last_youtube_updated': None,
-                'last_tiktok_updated': None,
-                'last_facebook_updated': None,
-                'active': influencer_data.get('active', True),
-                'created_at': influencer_data.get('created_at', datetime.utcnow()),
-                'updated_at': influencer_data.get('updated_at', datetime.utcnow())
-            }
-
-            # Check for duplicate handles
-            handles = {k: v for k, v in complete_data.items() if k.endswith('_handle')}
-            query_parts = []
-            params = []
-            
-            for platform_handle, handle in handles.items():
-                if not handle:
-                    continue
-                    
-                query_parts.append(f"""
-                    SELECT DISTINCT id, '{platform_handle.replace('_handle', '')}' as platform
-                    FROM `{self.project_id}.{self.dataset_id}.influencers`
-                    WHERE {platform_handle} = @{platform_handle}
-                    AND active = TRUE
-                """)
-                params.append(
-                    bigquery.ScalarQueryParameter(platform_handle, "STRING", handle)
-                )
-            
-            if query_parts:
-                query = " UNION ALL ".join(query_parts)
-                
-                job_config = bigquery.QueryJobConfig(
-                    query_parameters=params
-                )
-                
-                query_job = self.client.query(query, job_config=job_config)
-                results = query_job.result()
-                
-                # Group duplicates by user_id to check if they belong to different users
-                duplicates_by_user = {}
-                for row in results:
-                    duplicates_by_user.setdefault(row.id, []).append(row.platform)
-                
-                # Filter out the current user's duplicates
-                other_users_duplicates = {
-                    user_id: platforms 
-                    for user_id, platforms in duplicates_by_user.items()
-                    if user_id != influencer_data.get('id')
+            now = datetime.utcnow()
+            rows = []
+            for influencer_data in influencers:
+                row = {
+                    'id': influencer_data['id'],
+                    'name': influencer_data['name'],
+                    'active': influencer_data.get('active', True),
+                    'created_at': influencer_data.get('created_at', now),
+                    'updated_at': influencer_data.get('updated_at', now)
                 }
-                
-                if other_users_duplicates:
-                    duplicate_details = []
-                    for platforms in other_users_duplicates.values():
-                        for platform in platforms:
-                            handle = handles[f"{platform}_handle"]
-                            duplicate_details.append(f"{platform} ({handle})")
-                    raise ValueError(f"Handle(s) already exist in other accounts: {', '.join(duplicate_details)}")
-
-            # Insert the new influencer
-            table_id = f"{self.project_id}.{self.dataset_id}.influencers"
-            df = pd.DataFrame([complete_data])
-            
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=[
-                    bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-                    bigquery.SchemaField("name", "STRING", mode="REQUIRED"),
-                    bigquery.SchemaField("twitter_handle", "STRING", mode="NULLABLE"),
-                    bigquery.SchemaField("instagram_handle", "STRING", mode="NULLABLE"),
-                    bigquery.SchemaField("youtube_handle", "STRING", mode="NULLABLE"),
-                    bigquery.SchemaField("tiktok_handle", "STRING", mode="NULLABLE"),
-                    bigquery.SchemaField("facebook_handle", "STRING", mode="NULLABLE"),
-                    bigquery.SchemaField("last_twitter_updated", "TIMESTAMP", mode="NULLABLE"),
-                    bigquery.SchemaField("last_instagram_updated", "TIMESTAMP", mode="NULLABLE"),
-                    bigquery.SchemaField("last_youtube_updated", "TIMESTAMP", mode="NULLABLE"),
-                    bigquery.SchemaField("last_tiktok_updated", "TIMESTAMP", mode="NULLABLE"),
-                    bigquery.SchemaField("last_facebook_updated", "TIMESTAMP", mode="NULLABLE"),
-                    bigquery.SchemaField("active", "BOOLEAN", mode="REQUIRED"),
-                    bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
-                    bigquery.SchemaField("updated_at", "TIMESTAMP", mode="REQUIRED"),
+                for _, platform_handle in HANDLE_KEYS:
+                    row[platform_handle] = influencer_data.get(platform_handle)
+                rows.append(row)
+
+            # Duplicate check and insert in a single MERGE
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ArrayQueryParameter("rows", "STRUCT", [
+                        bigquery.StructQueryParameter(
+                            None,
+                            bigquery.ScalarQueryParameter("id", "STRING", row['id']),
+                            bigquery.ScalarQueryParameter("name", "STRING", row['name']),
+                            *(
+                                bigquery.ScalarQueryParameter(platform_handle, "STRING", row[platform_handle])
+                                for _, platform_handle in HANDLE_KEYS
+                            ),
+                            bigquery.ScalarQueryParameter("active", "BOOL", row['active']),
+                            bigquery.ScalarQueryParameter("created_at", "TIMESTAMP", row['created_at']),
+                            bigquery.ScalarQueryParameter("updated_at", "TIMESTAMP", row['updated_at'])
+                        )
+                        for row in rows
+                    ])
                 ]
             )
+            query_job = self.client.query(self._insert_influencers_sql, job_config=job_config)
+            query_job.result()
+            self.invalidate_influencers_cache()
+
+            inserted = query_job.num_dml_affected_rows or 0
+            if inserted < len(rows):
+                # Only look up what blocked the insert when something did
+                duplicate_details = self._find_duplicate_handles(rows)
+                if duplicate_details:
+                    raise ValueError(f"{DUPLICATE_HANDLES_MESSAGE}{', '.join(duplicate_details)}")
+                self.logger.warning(
+                    f"{len(rows) - inserted} influencer(s) not added, their id already exists"
+                )
+
+            for row in rows:
+                self.logger.info(f"Successfully added influencer: {row['name']}")
 
-            job = self.client.load_table_from_dataframe(
-                df, table_id, job_config=job_config
-            )
-            job.result()
-            
-            self.logger.info(f"Successfully added influencer: {influencer_data['name']}")
-        
         except Exception as e:
             self.logger.error(f"Error adding influencer to database: {str(e)}")
             raise
 
-    def get_last_update_date(self, influencer_id: str) -> Optional[datetime]:
+    def _find_duplicate_handles(self, rows: List[Dict]) -> List[str]:
+        """
+        Find handles in rows that already belong to a different active
+        influencer, as 'platform (handle)' strings
+        """
+        # Collect handles per column, remembering which new row owns each one
+        handles_by_column = {}
+        owners = {}
+        for row in rows:
+            for _, platform_handle in HANDLE_KEYS:
+                handle = row[platform_handle]
+                if not handle:
+                    continue
+                handles_by_column.setdefault(platform_handle, []).append(handle)
+                owners[(platform_handle, handle)] = row['id']
+
+        # One UNION ALL branch per platform
+        query_parts = []
+        params = []
+
+        for platform_handle, handles in handles_by_column.items():
+            query_parts.append(f"""
+                SELECT DISTINCT id, '{platform_handle.replace('_handle', '')}' as platform,
+                    {platform_handle} as handle
+                FROM `{self.project_id}.{self.dataset_id}.influencers`
+                WHERE {platform_handle} IN UNNEST(@{platform_handle})
+                AND active = TRUE
+            """)
+            params.append(
+                bigquery.ArrayQueryParameter(platform_handle, "STRING", handles)
+            )
+
+        if not query_parts:
+            return []
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=params
+        )
+
+        query_job = self.client.query(" UNION ALL ".join(query_parts), job_config=job_config)
+
+        # Only handles owned by a different user count as duplicates
+        return [
+            f"{row.platform} ({row.handle})"
+            for row in query_job.result()
+            if row.id != owners.get((f"{row.platform}_handle", row.handle))
+        ]
+
+    def get_last_update_date(self, influencer_id: str, lookback_days: Optional[int] = None) -> Optional[datetime]:
         """Get the last update date for an influencer"""
+        return self.get_last_update_dates([influencer_id], lookback_days).get(influencer_id)
+
+    def get_last_update_dates(self, influencer_ids: List[str], lookback_days: Optional[int] = None) -> Dict[str, datetime]:
+        """
+        Get the last update date for several influencers with a single query
+
+        Returns a dict mapping influencer_id to its last update date; ids
+        without any metrics are left out. When lookback_days is given, only
+        metrics from that many days back are considered, which scans just
+        those day partitions of each platform's metrics table.
+        """
         try:
+            if not influencer_ids:
+                return {}
 
-            query = f"""
-                SELECT MAX(timestamp) as last_update
-                FROM `{self.project_id}.{self.dataset_id}.social_metrics`
-                WHERE influencer_id = @influencer_id
-            """
-            
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("influencer_id", "STRING", influencer_id)
-                ]
-            )
+            query_parameters = [
+                bigquery.ArrayQueryParameter("influencer_ids", "STRING", influencer_ids)
+            ]
+            if lookback_days is None:
+                query = self._last_update_dates_sql
+            else:
+                query = self._recent_update_dates_sql
+                # Whole days, so repeated calls on the same day send the same bound
+                today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+                query_parameters.append(
+                    bigquery.ScalarQueryParameter("since", "TIMESTAMP", today - timedelta(days=lookback_days))
+                )
+
+            job_config = self._lookup_job_config(query_parameters)
             
             query_job = self.client.query(query, job_config=job_config)
-            result = next(query_job.result())
             
-            return result.last_update
+            return {
+                row['influencer_id']: row['last_update']
+                for row in query_job.result()
+                if row['last_update']
+            }
 
         except Exception as e:
             self.logger.error(f"Error fetching last update date: {str(e)}")
-            return None 
+            return {}
 
     def update_last_platform_update(self, platform: str, influencer_id: str, timestamp: datetime):
         """Update the last update timestamp for a specific platform"""
+        self.update_last_platform_updates(platform, [(influencer_id, timestamp)])
+
+    def update_last_platform_updates(self, platform: str, updates: List[Tuple[str, datetime]]):
+        """
+        Update the last update timestamp for a specific platform for several
+        influencers with a single MERGE statement
+
+        Args:
+            platform: Social media platform name
+            updates: List of (influencer_id, timestamp) tuples; when an id
+                appears more than once its latest timestamp is used
+        """
         try:
+            if not updates:
+                return
 
-            query = f"""
-                UPDATE `{self.project_id}.{self.dataset_id}.influencers`
-                SET last_{platform}_updated = @timestamp,
-                    updated_at = @timestamp
-                WHERE id = @influencer_id
-                AND {platform}_handle IS NOT NULL  -- Only update if platform handle exists
-            """
+            # MERGE allows at most one source row per target row
+            latest = {}
+            for influencer_id, timestamp in updates:
+                if influencer_id not in latest or timestamp > latest[influencer_id]:
+                    latest[influencer_id] = timestamp
+
+            query = self._platform_query(self._merge_last_platform_sql, platform)
             
             job_config = bigquery.QueryJobConfig(
                 query_parameters=[
-                    bigquery.ScalarQueryParameter("timestamp", "TIMESTAMP", timestamp),
-                    bigquery.ScalarQueryParameter("influencer_id", "STRING", influencer_id)
+                    bigquery.ArrayQueryParameter("updates", "STRUCT", [
+                        bigquery.StructQueryParameter(
+                            None,
+                            bigquery.ScalarQueryParameter("id", "STRING", influencer_id),
+                            bigquery.ScalarQueryParameter("ts", "TIMESTAMP", timestamp)
+                        )
+                        for influencer_id, timestamp in latest.items()
+                    ])
                 ]
             )
             
             query_job = self.client.query(query, job_config=job_config)
             query_job.result()
+            with self._cache_lock:
+                self._last_updates_cache.clear()
             
-            self.logger.info(f"Updated last_{platform}_updated for influencer {influencer_id}")
+            self.logger.info(f"Updated last_{platform}_updated for {len(latest)} influencers")
             
         except Exception as e:
             self.logger.error(f"Error updating last_{platform}_updated: {str(e)}")
@@ -389,81 +1010,114 @@ class DatabaseManager:
 
     def get_platform_last_update(self, platform: str, influencer_id: str) -> Optional[datetime]:
         """Get the last update date for a specific platform"""
+        return self.get_platform_last_updates(platform, [influencer_id]).get(influencer_id)
+
+    def get_platform_last_updates(self, platform: str, influencer_ids: List[str]) -> Dict[str, datetime]:
+        """
+        Get the last update date for a specific platform for several
+        influencers with a single query
+
+        Returns a dict mapping influencer_id to its last update date; ids
+        that were never updated or have no handle for the platform are left out.
+        Results are reused for LAST_UPDATES_CACHE_TTL seconds, until the
+        timestamps or handles are changed through this manager.
+        """
         try:
+            if not influencer_ids:
+                return {}
 
-            query = f"""
-                SELECT last_{platform}_updated
-                FROM `{self.project_id}.{self.dataset_id}.influencers`
-                WHERE id = @influencer_id
-                AND {platform}_handle IS NOT NULL  -- Only check if platform handle exists
-            """
-            
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("influencer_id", "STRING", influencer_id)
-                ]
-            )
-            
-            query_job = self.client.query(query, job_config=job_config)
-            results = list(query_job.result())
-            
-            if not results:  # No record found or no handle for this platform
-                return None
-            
-            return results[0][f"last_{platform}_updated"]
+            query = self._platform_query(self._platform_last_updates_sql, platform)
+            job_config = self._lookup_job_config([
+                bigquery.ArrayQueryParameter("influencer_ids", "STRING", influencer_ids)
+            ])
+            return self._cached_last_updates((platform, frozenset(influencer_ids)), query, job_config)
 
         except Exception as e:
             self.logger.error(f"Error fetching last_{platform}_updated: {str(e)}")
-            return None 
+            return {}
+
+    def get_stale_users(self, platform: str, days: int = 30) -> List[PlatformUser]:
+        """
+        Get the active influencers with a handle on a platform whose data
+        was last updated more than `days` days ago, or never
+
+        Returns a list of PlatformUser (id, handle) tuples.
+        """
+        try:
+            query = self._platform_query(self._stale_users_sql, platform)
+            # Whole days, so repeated calls on the same day can hit the query cache
+            today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            job_config = self._lookup_job_config([
+                bigquery.ScalarQueryParameter("cutoff", "TIMESTAMP", today - timedelta(days=days))
+            ])
+            query_job = self.client.query(query, job_config=job_config)
+            return [PlatformUser(row['id'], row['handle']) for row in query_job.result()]
+
+        except Exception as e:
+            self.logger.error(f"Error fetching stale {platform} users: {str(e)}")
+            raise
+
+    def _cached_last_updates(self, cache_key: Tuple, query: str,
+                             job_config: bigquery.QueryJobConfig) -> Dict[str, datetime]:
+        """Run a last-update query, reusing its result from the last-updates cache"""
+        with self._cache_lock:
+            cached = self._last_updates_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        query_job = self.client.query(query, job_config=job_config)
+
+        last_updates = {
+            row['id']: row['last_update']
+            for row in query_job.result()
+            if row['last_update']
+        }
+        with self._cache_lock:
+            self._last_updates_cache[cache_key] = last_updates
+        return dict(last_updates)
 
     def update_influencer_handles(self, influencer_id: str, updates: Dict[str, str]):
-        """Update social media handles for an influencer"""
+        """
+        Update social media handles for an influencer
+
+        The duplicate check and the UPDATE run as one transactional script;
+        handles already used by another active influencer raise ValueError
+        and leave the row unchanged.
+        """
         try:
+            handle_columns = {platform_handle for _, platform_handle in HANDLE_KEYS}
+            unknown = [key for key in updates if key not in handle_columns]
+            if unknown:
+                raise ValueError(f"Unsupported handle field(s): {', '.join(unknown)}")
+
+            params = [
+                bigquery.ScalarQueryParameter(platform_handle, "STRING", handle)
+                for platform_handle, handle in updates.items()
+            ]
 
             # Check for duplicate handles in other accounts
-            query_parts = []
-            params = []
-            
-            for platform_handle, handle in updates.items():
-                if not handle:
-                    continue
-                    
-                query_parts.append(f"""
-                    SELECT DISTINCT id, '{platform_handle.replace('_handle', '')}' as platform
+            query_parts = [
+                f"""
+                    SELECT DISTINCT CONCAT('{platform_handle.replace('_handle', '')} (', @{platform_handle}, ')') as detail
                     FROM `{self.project_id}.{self.dataset_id}.influencers`
                     WHERE {platform_handle} = @{platform_handle}
                     AND id != @influencer_id
                     AND active = TRUE
-                """)
-                params.append(
-                    bigquery.ScalarQueryParameter(platform_handle, "STRING", handle)
-                )
-            
+                """
+                for platform_handle, handle in updates.items()
+                if handle
+            ]
+            duplicate_check = ""
             if query_parts:
-                query = " UNION ALL ".join(query_parts)
-                
-                job_config = bigquery.QueryJobConfig(
-                    query_parameters=[
-                        *params,
-                        bigquery.ScalarQueryParameter("influencer_id", "STRING", influencer_id)
-                    ]
-                )
-                
-                query_job = self.client.query(query, job_config=job_config)
-                results = query_job.result()
-                
-                # Group duplicates by user_id
-                duplicates_by_user = {}
-                for row in results:
-                    duplicates_by_user.setdefault(row.id, []).append(row.platform)
-                
-                if duplicates_by_user:
-                    duplicate_details = []
-                    for platforms in duplicates_by_user.values():
-                        for platform in platforms:
-                            handle = updates[f"{platform}_handle"]
-                            duplicate_details.append(f"{platform} ({handle})")
-                    raise ValueError(f"Handle(s) already exist in other accounts: {', '.join(duplicate_details)}")
+                duplicate_check = f"""
+                    SET duplicates = (
+                        SELECT STRING_AGG(detail, ', ')
+                        FROM ({" UNION ALL ".join(query_parts)})
+                    );
+                    IF duplicates IS NOT NULL THEN
+                        RAISE USING MESSAGE = CONCAT('{DUPLICATE_HANDLES_MESSAGE}', duplicates);
+                    END IF;
+                """
 
             # Build SET clause
             set_clause = ", ".join([
@@ -471,11 +1125,15 @@ class DatabaseManager:
                 for handle_key in updates.keys()
             ])
             
-            query = f"""
+            script = f"""
+                DECLARE duplicates STRING;
+                BEGIN TRANSACTION;
+                {duplicate_check}
                 UPDATE `{self.project_id}.{self.dataset_id}.influencers`
                 SET {set_clause},
                     updated_at = @updated_at
-                WHERE id = @influencer_id
+                WHERE id = @influencer_id;
+                COMMIT TRANSACTION;
             """
             
             job_config = bigquery.QueryJobConfig(
@@ -486,8 +1144,18 @@ class DatabaseManager:
                 ]
             )
             
-            query_job = self.client.query(query, job_config=job_config)
-            query_job.result()
+            query_job = self.client.query(script, job_config=job_config)
+            try:
+                query_job.result()
+            except GoogleAPICallError as e:
+                # The script's RAISE comes back as a query error
+                match = re.search(re.escape(DUPLICATE_HANDLES_MESSAGE) + r"(.*?)(?: at \[\d+:\d+\]|;|$)", str(e))
+                if match:
+                    raise ValueError(f"{DUPLICATE_HANDLES_MESSAGE}{match.group(1).strip()}") from e
+                raise
+            self.invalidate_influencers_cache()
+            with self._cache_lock:
+                self._last_updates_cache.clear()
             
             self.logger.info(f"Successfully updated handles for influencer {influencer_id}")
             
@@ -520,9 +1188,10 @@ class DatabaseManager:
 
             # Prepare data for BigQuery
             metrics_data = []
-            for item in metrics:
+            now = datetime.utcnow()
+            for item, metric_id in zip(metrics, _bulk_uuid4_strs(len(metrics))):
                 metric = {
-                    'id': str(uuid.uuid4()),
+                    'id': metric_id,
                     'influencer_id': item['influencer_id'],
                     'influencer_handle': item['username'],
                     'followers': item['followers'],
@@ -530,11 +1199,10 @@ class DatabaseManager:
                     'tweets': item['tweets'],
                     'favorites': item['favorites'],
                     'timestamp': item['timestamp'],
-                    'created_at': datetime.utcnow()
+                    'created_at': now
                 }
                 metrics_data.append(metric)
 
-            df = pd.DataFrame(metrics_data)
             table_id = f"{self.project_id}.{self.dataset_id}.twitter_metrics"
             
             # Define schema
@@ -550,25 +1218,46 @@ class DatabaseManager:
                 bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
             ]
 
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=schema
-            )
-
-            @retry.Retry(predicate=retry.if_transient_error)
-            def load_table():
-                job = self.client.load_table_from_dataframe(
-                    df, table_id, job_config=job_config
-                )
-                return job.result()
-
-            load_table()
+            self._write_metrics(table_id, metrics_data, schema)
             self.logger.info(f"Successfully saved {len(metrics)} Twitter metrics")
 
         except Exception as e:
             self.logger.error(f"Error saving Twitter metrics: {str(e)}")
             raise
 
+    def _write_metrics(self, table_id: str, rows: List[Dict], schema: List[bigquery.SchemaField]):
+        """
+        Append metric rows through the Storage Write API when it is enabled,
+        streaming inserts for small batches otherwise, and a load job for
+        backfill-sized batches
+        """
+        if self.write_client is not None and len(rows) <= LOAD_CHUNK_SIZE:
+            self._append_rows(table_id, rows, schema)
+            return
+        if len(rows) <= STREAMING_INSERT_MAX_ROWS:
+            self._stream_rows(table_id, rows, schema)
+            return
+
+        self._start_parquet_load(table_id, self._to_arrow_table(rows, schema), schema).result()
+
+    @retry.Retry(predicate=retry.if_transient_error)
+    def _start_parquet_load(self, table_id: str, table: pa.Table, schema: List[bigquery.SchemaField]):
+        """
+        Start a WRITE_APPEND load job for an Arrow table sent as an in-memory
+        Parquet file, without pandas dtype inference
+        """
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression='snappy')
+
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_APPEND",
+            schema=schema
+        )
+        return self.client.load_table_from_file(
+            buffer, table_id, rewind=True, job_config=job_config
+        )
+
     def _safe_int_convert(self, value, default=0):
         """Safely convert a value to integer, handling floats and None"""
         try:
@@ -600,18 +1289,18 @@ class DatabaseManager:
 
             # Prepare data for BigQuery
             metrics_data = []
-            for item in metrics:
+            now = datetime.utcnow()
+            for item, metric_id in zip(metrics, _bulk_uuid4_strs(len(metrics))):
                 metric = {
-                    'id': str(uuid.uuid4()),
+                    'id': metric_id,
                     'influencer_id': item['influencer_id'],
                     'subscribers': self._safe_int_convert(item.get('subscribers')),
                     'total_views': self._safe_int_convert(item.get('total_views')),
                     'timestamp': item['timestamp'],
-                    'created_at': datetime.utcnow()
+                    'created_at': now
                 }
                 metrics_data.append(metric)
 
-            df = pd.DataFrame(metrics_data)
             table_id = f"{self.project_id}.{self.dataset_id}.youtube_metrics"
             
             # Define schema
@@ -624,19 +1313,7 @@ class DatabaseManager:
                 bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
             ]
 
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=schema
-            )
-
-            @retry.Retry(predicate=retry.if_transient_error)
-            def load_table():
-                job = self.client.load_table_from_dataframe(
-                    df, table_id, job_config=job_config
-                )
-                return job.result()
-
-            load_table()
+            self._write_metrics(table_id, metrics_data, schema)
             self.logger.info(f"Successfully saved {len(metrics)} YouTube metrics")
 
         except Exception as e:
@@ -669,9 +1346,10 @@ class DatabaseManager:
 
             # Prepare data for BigQuery
             metrics_data = []
-            for item in metrics:
+            now = datetime.utcnow()
+            for item, metric_id in zip(metrics, _bulk_uuid4_strs(len(metrics))):
                 metric = {
-                    'id': str(uuid.uuid4()),
+                    'id': metric_id,
                     'influencer_id': item['influencer_id'],
                     'followers': self._safe_int_convert(item.get('followers')),
                     'following': self._safe_int_convert(item.get('following')),
@@ -679,11 +1357,10 @@ class DatabaseManager:
                     'avg_likes': self._safe_int_convert(item.get('avg_likes')),
                     'avg_comments': float(item.get('avg_comments', 0.0)),
                     'timestamp': item['timestamp'],
-                    'created_at': datetime.utcnow()
+                    'created_at': now
                 }
                 metrics_data.append(metric)
 
-            df = pd.DataFrame(metrics_data)
             table_id = f"{self.project_id}.{self.dataset_id}.instagram_metrics"
             
             # Define schema
@@ -699,24 +1376,12 @@ class DatabaseManager:
                 bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
             ]
 
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=schema
-            )
-
-            @retry.Retry(predicate=retry.if_transient_error)
-            def load_table():
-                job = self.client.load_table_from_dataframe(
-                    df, table_id, job_config=job_config
-                )
-                return job.result()
-
-            load_table()
+            self._write_metrics(table_id, metrics_data, schema)
             self.logger.info(f"Successfully saved {len(metrics)} Instagram metrics")
 
         except Exception as e:
             self.logger.error(f"Error saving Instagram metrics: {str(e)}")
-            self.logger.warning("Some metrics may have been truncated")
+            raise
 
     def save_tiktok_metrics(self, metrics: List[Dict]):
         """
@@ -743,20 +1408,20 @@ class DatabaseManager:
 
             # Prepare data for BigQuery
             metrics_data = []
-            for item in metrics:
+            now = datetime.utcnow()
+            for item, metric_id in zip(metrics, _bulk_uuid4_strs(len(metrics))):
                 metric = {
-                    'id': str(uuid.uuid4()),
+                    'id': metric_id,
                     'influencer_id': item['influencer_id'],
                     'followers': self._safe_int_convert(item.get('followers')),
                     'following': self._safe_int_convert(item.get('following')),
                     'likes': self._safe_int_convert(item.get('likes')),
                     'uploads': self._safe_int_convert(item.get('uploads')),
                     'timestamp': item['timestamp'],
-                    'created_at': datetime.utcnow()
+                    'created_at': now
                 }
                 metrics_data.append(metric)
 
-            df = pd.DataFrame(metrics_data)
             table_id = f"{self.project_id}.{self.dataset_id}.tiktok_metrics"
             
             # Define schema
@@ -771,48 +1436,54 @@ class DatabaseManager:
                 bigquery.SchemaField("created_at", "TIMESTAMP", mode="REQUIRED"),
             ]
 
-            job_config = bigquery.LoadJobConfig(
-                write_disposition="WRITE_APPEND",
-                schema=schema
-            )
-
-            @retry.Retry(predicate=retry.if_transient_error)
-            def load_table():
-                job = self.client.load_table_from_dataframe(
-                    df, table_id, job_config=job_config
-                )
-                return job.result()
-
-            load_table()
+            self._write_metrics(table_id, metrics_data, schema)
             self.logger.info(f"Successfully saved {len(metrics)} TikTok metrics")
 
         except Exception as e:
             self.logger.error(f"Error saving TikTok metrics: {str(e)}")
-            self.logger.warning("Some metrics may have been truncated")
+            raise
 
 def init_database(client):
     logger = logging.getLogger(__name__)
     try:
-        # Read the SQL script
-        with open('schema/create_tables.sql', 'r') as f:
-            sql_script = f.read()
-        
-        # Replace placeholders with Config values
-        sql_script = sql_script.format(
-            project_id=Config.BIGQUERY_PROJECT_ID,
-            dataset=Config.BIGQUERY_DATASET
+        # Only run the DDL again when the target or the script has changed
+        key = (
+            Config.BIGQUERY_PROJECT_ID,
+            Config.BIGQUERY_DATASET,
+            os.path.getmtime(SCHEMA_SCRIPT)
         )
-        
-        # Execute each statement separately
-        statements = [s.strip() for s in sql_script.split(';') if s.strip()]
-        for statement in statements:
-            try:
-                query_job = client.query(statement)
-                query_job.result()  # Wait for the query to complete
-            except Exception as e:
-                logger.error(f"Error executing statement: {statement}")
-                logger.error(f"Error details: {str(e)}")
-                raise
+        with _ddl_lock:
+            if key in _ddl_done:
+                return
+
+            # Read the SQL script
+            with open(SCHEMA_SCRIPT, 'r') as f:
+                sql_script = f.read()
+            
+            # Replace placeholders with Config values
+            sql_script = sql_script.format(
+                project_id=Config.BIGQUERY_PROJECT_ID,
+                dataset=Config.BIGQUERY_DATASET
+            )
+            
+            # Execute each statement separately; they are independent
+            # CREATE TABLE IF NOT EXISTS statements, so run them concurrently
+            statements = [s.strip() for s in sql_script.split(';') if s.strip()]
+
+            def run_statement(statement):
+                try:
+                    query_job = client.query(statement)
+                    query_job.result()  # Wait for the query to complete
+                except Exception as e:
+                    logger.error(f"Error executing statement: {statement}")
+                    logger.error(f"Error details: {str(e)}")
+                    raise
+
+            with ThreadPoolExecutor(max_workers=DDL_MAX_WORKERS) as executor:
+                for future in [executor.submit(run_statement, statement) for statement in statements]:
+                    future.result()
+
+            _ddl_done.add(key)
                 
         logger.info("Database tables initialized successfully")
         
@@ -821,6 +1492,6 @@ def init_database(client):
         raise
 
 def get_client():
-    client = bigquery.Client()
+    client = _shared_client(Config.BIGQUERY_PROJECT_ID, Config.GOOGLE_CREDENTIALS_PATH)
     init_database(client)
     return client 
\ No newline at end of file
@@ -1,11 +1,406 @@
-import json
 import os
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import logging
+import sqlite3
+import threading
+import time
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
 from config import Config
+from database import DatabaseManager, PlatformUser
+
+# Concurrent API requests in the whole process, across all platforms' fetchers,
+# kept low for the API's rate limit
+FETCH_MAX_WORKERS = 8
+# Seconds an API response is reused for the same handle and history type
+RESPONSE_CACHE_TTL = 86400
+# Decoded responses held in memory; only CLI runs repeat requests within a
+# process, so a few recent ones are enough
+RESPONSE_CACHE_MAXSIZE = 64
+# Seconds a stored response and its ETag/Last-Modified are kept for
+# conditional requests
+VALIDATOR_CACHE_TTL = 7 * 86400
+
+# Background writer for dev-mode raw response dumps; pending writes finish
+# before the interpreter exits
+_RAW_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='raw-save')
+
+def _write_raw_response(filepath: str, payload: bytes, platform: str, username: str) -> None:
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(payload)
+    except Exception as e:
+        logging.getLogger(__name__).error("Error saving raw response for %s user %s: %s", platform, username, e)
+
+_RESPONSE_DB_LOCK = threading.Lock()
+
+# Held around every API request, so platforms fetched side by side still share
+# the FETCH_MAX_WORKERS limit
+_API_REQUEST_SLOTS = threading.BoundedSemaphore(FETCH_MAX_WORKERS)
+
+@lru_cache(maxsize=1)
+def _response_db() -> Optional[sqlite3.Connection]:
+    """
+    SQLite store of raw API responses at Config.RESPONSE_CACHE_DB, shared by
+    all fetchers and kept across runs; None when not configured
+
+    Holds one row per endpoint, handle and history type. Rows too old to be
+    revalidated are deleted when the store is opened, so the file only holds
+    recent responses.
+    """
+    path = getattr(Config, 'RESPONSE_CACHE_DB', None)
+    if not path:
+        return None
+    path = os.path.expanduser(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, fetched_at INTEGER NOT NULL, etag TEXT, "
+        "last_modified TEXT, body BLOB NOT NULL)"
+    )
+    with conn:
+        conn.execute(
+            "DELETE FROM responses WHERE fetched_at <= ?",
+            (int(time.time()) - VALIDATOR_CACHE_TTL,)
+        )
+    return conn
+
+def _load_stored_response(key: str) -> Optional[Tuple[int, Optional[str], Optional[str], bytes]]:
+    """(fetched_at, ETag, Last-Modified, body) stored for key, if any"""
+    try:
+        conn = _response_db()
+        if conn is None:
+            return None
+        with _RESPONSE_DB_LOCK:
+            return conn.execute(
+                "SELECT fetched_at, etag, last_modified, body FROM responses "
+                "WHERE key = ? AND fetched_at > ?",
+                (key, int(time.time()) - VALIDATOR_CACHE_TTL)
+            ).fetchone()
+    except (OSError, sqlite3.Error) as e:
+        logging.getLogger(__name__).warning("Response cache read failed: %s", e)
+        return None
+
+def _store_response(key: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+    try:
+        conn = _response_db()
+        if conn is None:
+            return
+        with _RESPONSE_DB_LOCK, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, fetched_at, etag, last_modified, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, int(time.time()), etag, last_modified, body)
+            )
+    except (OSError, sqlite3.Error) as e:
+        logging.getLogger(__name__).warning("Response cache write failed: %s", e)
+
+@lru_cache(maxsize=4096)
+def parse_day(date: str) -> datetime:
+    """
+    Parse a 'YYYY-MM-DD' date from the API as UTC midnight
+
+    The same days recur in every user's daily history, so each distinct date
+    is parsed once.
+    """
+    return datetime.fromisoformat(date).replace(tzinfo=timezone.utc)
+
+@lru_cache(maxsize=1)
+def shared_session() -> requests.Session:
+    """
+    HTTP session shared by all fetchers, so connections to the API are kept
+    alive and reused; transient failures and rate limiting are retried with
+    backoff
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False
+        )
+    )
+    session.mount('https://', adapter)
+    return session
+
+def close_shared_session() -> None:
+    """Close the shared session's pooled connections; a new session is made on next use"""
+    if shared_session.cache_info().currsize:
+        shared_session().close()
+        shared_session.cache_clear()
 
 class BaseFetcher:
+    """
+    Fetcher for one platform's SocialBlade statistics endpoint
+
+    Platform fetchers only configure the class attributes below.
+    """
+    # Platform name, as used in the endpoint URL, table and column names
+    PLATFORM = None
+    # Platform name for log messages
+    DISPLAY_NAME = None
+    # (metric key, key in the API's daily entries) for each saved value
+    FIELDS = ()
+    # Whether each metric carries the requested handle as 'username'
+    INCLUDE_USERNAME = True
+
+    # Default-history API responses by (endpoint, handle, history type, UTC day),
+    # shared by all fetchers; extended histories are too large to hold on to
+    _response_cache = TTLCache(maxsize=RESPONSE_CACHE_MAXSIZE, ttl=RESPONSE_CACHE_TTL)
+    _response_cache_lock = threading.Lock()
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Args:
+            db: DatabaseManager to save through; one is created on first use
+                when not given
+        """
+        self._db = db
+        self.client_id = Config.SOCIALBLADE_CLIENT_ID
+        self.token = Config.SOCIALBLADE_TOKEN
+        self.base_url = f"https://matrix.sbapis.com/b/{self.PLATFORM}/statistics"
+        self.logger = logging.getLogger(type(self).__module__)
+        self.session = shared_session()
+        # Request headers other than the handle, per history type
+        self._header_templates = {
+            history_type: {
+                'history': history_type,
+                'clientid': self.client_id,
+                'token': self.token
+            }
+            for history_type in ('default', 'extended')
+        }
+
+    @property
+    def db(self) -> DatabaseManager:
+        """The DatabaseManager shared by all of this fetcher's calls"""
+        if self._db is None:
+            self._db = DatabaseManager()
+        return self._db
+
+    def fetch_all(self, users: List[PlatformUser]) -> List[Dict]:
+        """
+        Fetch data for users that are due for an update
+        
+        Args:
+            users: List of PlatformUser (id, handle) tuples, already
+                filtered to the stale ones (see DatabaseManager.get_stale_users)
+        """
+        results = []
+        last_update_batch = []
+        db = self.db
+        
+        # Requests are I/O bound, so several users are fetched at once; results
+        # are still handled in user order
+        with ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(self._fetch_metrics, user.handle, 'default', user.id)
+                for user in users
+            ]
+            for user, future in zip(users, futures):
+                try:
+                    metrics, latest_timestamp = future.result()
+                    if metrics:
+                        results.extend(metrics)
+                        last_update_batch.append((user.id, latest_timestamp))
+                        
+                except Exception as e:
+                    self.logger.error("Error fetching data for %s user %s: %s", self.DISPLAY_NAME, user.handle, e)
+        
+        if not results:
+            return results
+
+        # Save all users' metrics in one write, then their last update timestamps;
+        # if the save fails the timestamps are left alone so the users are retried
+        try:
+            self._save_metrics(db, results)
+        except Exception as e:
+            self.logger.error("Error saving %s metrics: %s", self.DISPLAY_NAME, e)
+            return results
+
+        try:
+            db.update_last_platform_updates(self.PLATFORM, last_update_batch)
+        except Exception as e:
+            self.logger.error("Error updating last update timestamps for %s: %s", self.DISPLAY_NAME, e)
+            
+        return results
+
+    def fetch_user(self, user: Dict) -> List[Dict]:
+        """
+        Fetch recent metrics for a user if needed
+        
+        Args:
+            user: Dictionary with 'id' and 'handle'
+        """
+        db = self.db
+        
+        # Check last update time
+        last_update = db.get_platform_last_update(self.PLATFORM, user['id'])
+        if last_update:
+            # Convert last_update to UTC if it's naive
+            if last_update.tzinfo is None:
+                last_update = last_update.replace(tzinfo=timezone.utc)
+            
+            # Get current time in UTC
+            now = datetime.now(timezone.utc)
+            
+            if (now - last_update) < timedelta(days=30):
+                self.logger.info("Skipping %s - last update was less than 30 days ago", user['handle'])
+                return []
+
+        metrics, latest_timestamp = self._fetch_metrics(user['handle'], 'default', user['id'])
+        if metrics:
+            # Save metrics and update last update timestamp
+            self._save_metrics(db, metrics)
+            db.update_last_platform_update(self.PLATFORM, user['id'], latest_timestamp)
+            
+        return metrics
+
+    def fetch_user_history(self, user: Dict) -> List[Dict]:
+        """
+        Fetch extended historical data for a user
+        Always fetches regardless of last update time since this is for initialization
+        """
+        db = self.db
+        metrics, latest_timestamp = self._fetch_metrics(user['handle'], 'extended', user['id'])
+        
+        if metrics:
+            # Save metrics and update last update timestamp
+            self._save_metrics(db, metrics)
+            db.update_last_platform_update(self.PLATFORM, user['id'], latest_timestamp)
+            
+        return metrics
+
+    def _save_metrics(self, db: DatabaseManager, metrics: List[Dict]):
+        """Save metrics with the platform's DatabaseManager.save_<platform>_metrics"""
+        getattr(db, f"save_{self.PLATFORM}_metrics")(metrics)
+
+    def _fetch_metrics(self, handle: str, history_type: str = 'default',
+                       influencer_id: Optional[str] = None) -> Tuple[List[Dict], Optional[datetime]]:
+        """
+        Fetch metrics from the platform's API
+        
+        Args:
+            handle: Handle or channel ID on the platform
+            history_type: Either 'default' or 'extended'
+            influencer_id: Set on every metric when given
+
+        Returns the metrics and their latest timestamp (None without metrics),
+        both collected in a single pass over the response
+        """
+        try:
+            data = self._get_json(handle, history_type)
+            
+            # Save raw response
+            response_type = f'{self.PLATFORM}_history' if history_type == 'extended' else self.PLATFORM
+            self._save_raw_response(data, response_type, handle)
+            
+            # Extract daily metrics
+            metrics = []
+            latest = None
+            if data.get('data', {}).get('daily'):
+                for daily_data in data['data']['daily']:
+                    metric = {'username': handle} if self.INCLUDE_USERNAME else {}
+                    for key, api_key in self.FIELDS:
+                        metric[key] = daily_data.get(api_key)
+                    # Parse date as a timezone-aware UTC midnight
+                    timestamp = parse_day(daily_data['date'])
+                    metric['timestamp'] = timestamp
+                    if influencer_id is not None:
+                        metric['influencer_id'] = influencer_id
+                    metrics.append(metric)
+                    if latest is None or timestamp > latest:
+                        latest = timestamp
+            
+            return metrics, latest
+
+        except requests.exceptions.Timeout:
+            self.logger.error("Timeout while fetching data for %s", handle)
+            raise
+        except requests.exceptions.RequestException as e:
+            self.logger.error("Request failed for %s: %s", handle, e)
+            raise
+        except ValueError as e:
+            self.logger.error("Invalid JSON response for %s: %s", handle, e)
+            raise
+
+    def _get_json(self, query: str, history_type: str) -> Dict:
+        """
+        Request the statistics for a handle from the fetcher's endpoint
+
+        A default-history response fetched earlier the same UTC day for the
+        same handle is reused from memory instead of calling the API again.
+
+        With Config.RESPONSE_CACHE_DB set, responses are also kept on disk with
+        their ETag/Last-Modified, so they outlive the process: same-day ones
+        are reused for reruns and retries, and older ones are revalidated with
+        If-None-Match/If-Modified-Since, their body being reused when the API
+        answers 304 Not Modified.
+        """
+        today = datetime.utcnow().date()
+        cache_key = (self.base_url, query, history_type, today)
+        memoize = history_type == 'default'
+        if memoize:
+            with self._response_cache_lock:
+                data = self._response_cache.get(cache_key)
+            if data is not None:
+                return data
+
+        stored_key = '|'.join((self.base_url, query, history_type))
+        stored = _load_stored_response(stored_key)
+        headers = {'query': query, **self._header_templates[history_type]}
+        if stored is not None:
+            fetched_at, etag, last_modified, body = stored
+            if datetime.fromtimestamp(fetched_at, timezone.utc).date() == today:
+                data = orjson.loads(body)
+                if memoize:
+                    with self._response_cache_lock:
+                        self._response_cache[cache_key] = data
+                return data
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        with _API_REQUEST_SLOTS:
+            response = self.session.get(
+                self.base_url,
+                headers=headers,
+                timeout=10
+            )
+        response.raise_for_status()
+        if response.status_code == 304:
+            # Only conditional requests, sent for a stored row, can be answered
+            # with an empty 304
+            if stored is None:
+                raise requests.exceptions.HTTPError(
+                    "304 Not Modified for an unconditional request, no stored response to reuse",
+                    response=response
+                )
+            etag = response.headers.get('ETag') or etag
+            last_modified = response.headers.get('Last-Modified') or last_modified
+        else:
+            body = response.content
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+        data = orjson.loads(body)
+        _store_response(stored_key, etag, last_modified, body)
+
+        if memoize:
+            with self._response_cache_lock:
+                self._response_cache[cache_key] = data
+        return data
+
     def _save_raw_response(self, data: Dict, platform: str, username: str) -> None:
         """
         Save raw API response to JSON file when in dev mode
@@ -28,9 +423,10 @@ class BaseFetcher:
             filename = f"{platform}_{username}_{timestamp}.json"
             filepath = os.path.join('raw-data', filename)
             
-            # Save JSON response
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Encode here, in C by orjson; only the disk write is left to the
+            # background thread, so the fetch continues without waiting on it
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            _RAW_SAVE_EXECUTOR.submit(_write_raw_response, filepath, payload, platform, username)
                 
         except Exception as e:
-            logging.getLogger(__name__).error(f"Error saving raw response for {platform} user {username}: {str(e)}") 
\ No newline at end of file
+            logging.getLogger(__name__).error("Error saving raw response for %s user %s: %s", platform, username, e) 
\ No newline at end of file
@@ -1,13 +1,11 @@
 import argparse
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
 from database import DatabaseManager
-from fetchers.twitter_fetcher import TwitterFetcher
-from fetchers.youtube_fetcher import YoutubeFetcher
-from fetchers.instagram_fetcher import InstagramFetcher
-from fetchers.tiktok_fetcher import TiktokFetcher
-from cli import add_influencer, edit_influencer, fetch_user_history, setup_logging, save_to_csv, fetch_user_metrics
+from cli import add_influencer, edit_influencer, fetch_user_history, setup_logging, fetch_user_metrics, get_fetcher_classes
+from utils import save_to_csv
 
 def main():
     parser = argparse.ArgumentParser(description='Social Media Influencer Data Fetcher')
@@ -45,59 +43,62 @@ def main():
         # Main data collection flow
         db = DatabaseManager()
         fetchers = {
-            'twitter': TwitterFetcher(),
-            'youtube': YoutubeFetcher(),
-            'instagram': InstagramFetcher(),
-            'tiktok': TiktokFetcher()
+            platform: fetcher_class(db)
+            for platform, fetcher_class in get_fetcher_classes().items()
         }
         
-        influencers = db.get_active_influencers()
-        if not influencers:
-            logger.warning("No active influencers found")
-            return
+        def collect(platform, fetcher):
+            logger.info("Starting data collection for %s", platform)
+            # Only users not updated in the last 30 days, selected in one query
+            platform_users = db.get_stale_users(platform)
             
-        for platform, fetcher in fetchers.items():
-            try:
-                logger.info(f"Starting data collection for {platform}")
-                platform_users = [
-                    {'id': inf['id'], 'handle': inf['handles'][platform]} 
-                    for inf in influencers 
-                    if platform in inf.get('handles', {})
-                ]
-                
-                if not platform_users:
-                    logger.info(f"No users found for {platform}")
-                    continue
-                
-                # Get last update dates for all users at once
-                last_updates = {}
-                for user in platform_users:
-                    last_update = db.get_platform_last_update(platform, user['id'])
-                    if last_update:
-                        last_updates[user['id']] = last_update
-                
-                # Pass last_updates to fetcher to validate before making API calls
-                data = fetcher.fetch_all(platform_users, last_updates)
-                
-                if data:
-                    # Save to CSV if requested
-                    if args.save_csv:
-                        for item in data:
-                            save_to_csv(item, platform, item.get('username') or item.get('channel_id'))
-                    
-                    # Save to database
-                    db.save_influencer_data(platform, data)
-                    logger.info(f"Successfully processed {len(data)} records for {platform}")
-                else:
-                    logger.warning(f"No data collected for {platform}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing {platform}: {str(e)}")
-                continue
+            if not platform_users:
+                logger.info("No users due for an update on %s", platform)
+                return None
+            
+            data = fetcher.fetch_all(platform_users)
+            
+            if data:
+                # Save to CSV if requested
+                if args.save_csv:
+                    for item in data:
+                        save_to_csv(item, platform, item.get('username') or item.get('channel_id'))
+            else:
+                logger.warning("No data collected for %s", platform)
+            return data
+        
+        # Platforms are independent, so their fetches run side by side; API
+        # requests still share one FETCH_MAX_WORKERS limit across platforms
+        collected = {}
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+            futures = {
+                executor.submit(collect, platform, fetcher): platform
+                for platform, fetcher in fetchers.items()
+            }
+            for future in as_completed(futures):
+                platform = futures[future]
+                try:
+                    data = future.result()
+                    if data:
+                        collected[platform] = data
+                except Exception as e:
+                    logger.error("Error processing %s: %s", platform, e)
+        
+        # Save to database, all platforms at once
+        failures = db.save_influencer_data_many(collected)
+        for platform, data in collected.items():
+            if platform in failures:
+                logger.error("Error processing %s: %s", platform, failures[platform])
+            else:
+                logger.info("Successfully processed %s records for %s", len(data), platform)
                 
     except Exception as e:
-        logger.error(f"Critical error in main execution: {str(e)}")
+        logger.error("Critical error in main execution: %s", e)
         raise
+    finally:
+        # Release the API connections kept alive for the fetchers
+        from fetchers.base_fetcher import close_shared_session
+        close_shared_session()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
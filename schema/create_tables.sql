@@ -26,7 +26,9 @@ CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.twitter_metrics` (
     favorites INT64,
     timestamp TIMESTAMP NOT NULL,
     created_at TIMESTAMP NOT NULL
-);
+)
+PARTITION BY DATE(timestamp)
+CLUSTER BY influencer_id;
 
 CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.youtube_metrics` (
     id STRING NOT NULL,
@@ -35,7 +37,9 @@ CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.youtube_metrics` (
     total_views INT64 DEFAULT 0,
     timestamp TIMESTAMP NOT NULL,
     created_at TIMESTAMP NOT NULL
-);
+)
+PARTITION BY DATE(timestamp)
+CLUSTER BY influencer_id;
 
 CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.instagram_metrics` (
     id STRING NOT NULL,
@@ -48,7 +52,9 @@ CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.instagram_metrics` (
     engagement_rate FLOAT64 DEFAULT 0.0,
     timestamp TIMESTAMP NOT NULL,
     created_at TIMESTAMP NOT NULL
-);
+)
+PARTITION BY DATE(timestamp)
+CLUSTER BY influencer_id;
 
 CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.tiktok_metrics` (
     id STRING NOT NULL,
@@ -59,4 +65,6 @@ CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.tiktok_metrics` (
     uploads INT64 DEFAULT 0,
     timestamp TIMESTAMP NOT NULL,
     created_at TIMESTAMP NOT NULL
-); 
\ No newline at end of file
+)
+PARTITION BY DATE(timestamp)
+CLUSTER BY influencer_id; 
\ No newline at end of file
@@ -2,9 +2,9 @@ import pytest
 import os
 from unittest.mock import patch
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope='session')
 def mock_env_vars():
-    """Mock environment variables for testing"""
+    """Mock environment variables for testing, once per (xdist worker) session"""
     with patch.dict(os.environ, {
         'BIGQUERY_PROJECT_ID': 'test-project',
         'BIGQUERY_DATASET': 'test-dataset',
@@ -0,0 +1,158 @@
+import pytest
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from database import DatabaseManager, PlatformUser
+from fetchers.base_fetcher import FETCH_MAX_WORKERS, VALIDATOR_CACHE_TTL, BaseFetcher, _load_stored_response, _response_db, _store_response
+from fetchers.tiktok_fetcher import TiktokFetcher
+from fetchers.twitter_fetcher import TwitterFetcher
+
+@pytest.fixture
+def response_db_path(tmp_path, monkeypatch):
+    path = tmp_path / 'socialblade.db'
+    monkeypatch.setattr(Config, 'RESPONSE_CACHE_DB', str(path), raising=False)
+    _response_db.cache_clear()
+    yield path
+    if _response_db.cache_info().currsize and _response_db() is not None:
+        _response_db().close()
+    _response_db.cache_clear()
+
+def test_response_db_prunes_expired_rows_on_open(response_db_path):
+    # Setup
+    _store_response('fresh', None, None, b'{}')
+    _response_db().execute(
+        "INSERT INTO responses (key, fetched_at, body) VALUES (?, ?, ?)",
+        ('expired', int(time.time()) - VALIDATOR_CACHE_TTL - 1, b'{}')
+    )
+    _response_db().commit()
+    _response_db().close()
+    _response_db.cache_clear()
+
+    # Execute
+    keys = {row[0] for row in _response_db().execute("SELECT key FROM responses")}
+
+    # Verify
+    assert keys == {'fresh'}
+    assert _load_stored_response('fresh')[3] == b'{}'
+
+def test_get_json_revalidates_stored_response_across_runs(response_db_path):
+    # Setup: a response stored with its ETag by an earlier day's run
+    fetcher = TwitterFetcher(MagicMock())
+    stored_key = '|'.join((fetcher.base_url, 'user25', 'default'))
+    _store_response(stored_key, '"v1"', None, b'{"data": {"daily": []}}')
+    _response_db().execute("UPDATE responses SET fetched_at = ?", (int(time.time()) - 86400 * 2,))
+    _response_db().commit()
+    fetcher.session = MagicMock()
+    fetcher.session.get.return_value = MagicMock(status_code=304, headers={})
+    BaseFetcher._response_cache.clear()
+
+    # Execute
+    data = fetcher._get_json('user25', 'default')
+
+    # Verify
+    headers = fetcher.session.get.call_args[1]['headers']
+    assert headers['If-None-Match'] == '"v1"'
+    assert data == {'data': {'daily': []}}
+    fetched_at, etag, _, _ = _load_stored_response(stored_key)
+    assert etag == '"v1"'
+    assert datetime.fromtimestamp(fetched_at, timezone.utc).date() == datetime.utcnow().date()
+
+def test_get_json_reuses_same_day_stored_response(response_db_path):
+    # Setup
+    fetcher = TwitterFetcher(MagicMock())
+    _store_response('|'.join((fetcher.base_url, 'user26', 'default')), None, None, b'{"data": {}}')
+    fetcher.session = MagicMock()
+    BaseFetcher._response_cache.clear()
+
+    # Execute
+    data = fetcher._get_json('user26', 'default')
+
+    # Verify
+    assert data == {'data': {}}
+    assert not fetcher.session.get.called
+
+def test_get_json_keeps_only_default_history_in_memory(response_db_path, monkeypatch):
+    # Setup
+    monkeypatch.setattr(Config, 'RESPONSE_CACHE_DB', None, raising=False)
+    _response_db.cache_clear()
+    fetcher = TwitterFetcher(MagicMock())
+    fetcher.session = MagicMock()
+    fetcher.session.get.return_value = MagicMock(status_code=200, content=b'{"data": {}}', headers={})
+    BaseFetcher._response_cache.clear()
+
+    # Execute
+    for history_type in ('default', 'default', 'extended', 'extended'):
+        fetcher._get_json('user27', history_type)
+
+    # Verify
+    assert fetcher.session.get.call_count == 3
+    assert len(BaseFetcher._response_cache) == 1
+
+def test_fetch_all_keeps_last_updates_when_save_fails():
+    # Setup: the streaming insert rejects the batch
+    with patch('google.cloud.bigquery.Client'):
+        db = DatabaseManager()
+    db.client = MagicMock()
+    db.client.insert_rows_json.return_value = [{'index': 0, 'errors': ['invalid']}]
+    fetcher = TiktokFetcher(db)
+    timestamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    metrics = [{'username': 'user29', 'followers': 1, 'timestamp': timestamp, 'influencer_id': 'test-id-29'}]
+
+    # Execute
+    with patch.object(fetcher, '_fetch_metrics', return_value=(metrics, timestamp)), \
+            patch.object(db, 'update_last_platform_updates') as mock_update:
+        results = fetcher.fetch_all([PlatformUser('test-id-29', 'user29')])
+
+    # Verify
+    assert results == metrics
+    assert db.client.insert_rows_json.called
+    assert not mock_update.called
+
+def test_api_requests_share_one_limit_across_platforms(response_db_path, monkeypatch):
+    # Setup
+    monkeypatch.setattr(Config, 'RESPONSE_CACHE_DB', None, raising=False)
+    _response_db.cache_clear()
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def get(*args, **kwargs):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+        return MagicMock(status_code=200, content=b'{"data": {}}', headers={})
+
+    fetchers = [TwitterFetcher(MagicMock()), TiktokFetcher(MagicMock())]
+    for fetcher in fetchers:
+        fetcher.session = MagicMock()
+        fetcher.session.get.side_effect = get
+    BaseFetcher._response_cache.clear()
+
+    # Execute
+    with ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS * 2) as executor:
+        list(executor.map(
+            lambda i: fetchers[i % 2]._get_json(f'user{i}', 'extended'),
+            range(FETCH_MAX_WORKERS * 4)
+        ))
+
+    # Verify
+    assert max(peak) <= FETCH_MAX_WORKERS
+
+def test_get_json_rejects_not_modified_without_stored_response(response_db_path):
+    # Setup
+    fetcher = TwitterFetcher(MagicMock())
+    fetcher.session = MagicMock()
+    fetcher.session.get.return_value = MagicMock(status_code=304, content=b'', headers={})
+    BaseFetcher._response_cache.clear()
+
+    # Execute & Verify
+    with pytest.raises(requests.exceptions.HTTPError, match='304 Not Modified'):
+        fetcher._get_json('user30', 'default')
+    assert 'If-None-Match' not in fetcher.session.get.call_args[1]['headers']
@@ -1,8 +1,13 @@
 import pytest
-from datetime import datetime
-from database import DatabaseManager
+import asyncio
+import uuid
+from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.parquet as pq
+from database import DatabaseManager, METRICS_TABLES, PlatformUser, STREAMING_INSERT_MAX_ROWS, _bulk_uuid4_strs, init_database
 from unittest.mock import MagicMock, patch
 from google.cloud import bigquery
+from google.api_core.exceptions import BadRequest, NotFound
 
 @pytest.fixture
 def db_manager():
@@ -19,8 +24,8 @@ def mock_query_job():
 
 def test_add_influencer_with_unique_handles(db_manager, mock_query_job):
     # Setup
+    mock_query_job.num_dml_affected_rows = 1
     db_manager.client.query.return_value = mock_query_job
-    db_manager.client.load_table_from_dataframe.return_value.result.return_value = None
     
     influencer_data = {
         'id': 'test-id-1',
@@ -36,19 +41,22 @@ def test_add_influencer_with_unique_handles(db_manager, mock_query_job):
     db_manager.add_influencer(influencer_data)
     
     # Verify
-    assert db_manager.client.query.called
-    assert db_manager.client.load_table_from_dataframe.called
+    assert db_manager.client.query.call_count == 1
+    assert 'MERGE' in db_manager.client.query.call_args[0][0]
+    assert not db_manager.client.load_table_from_dataframe.called
 
 def test_add_influencer_with_duplicate_handle_different_user(db_manager, mock_query_job):
     # Setup
     class MockResult:
-        def __init__(self, id, platform):
+        def __init__(self, id, platform, handle):
             self.id = id
             self.platform = platform
+            self.handle = handle
     
     mock_query_job.result.return_value = [
-        MockResult('existing-id', 'twitter')  # Simulate existing handle
+        MockResult('existing-id', 'twitter', 'duplicate_handle')  # Simulate existing handle
     ]
+    mock_query_job.num_dml_affected_rows = 0  # MERGE skipped the batch
     db_manager.client.query.return_value = mock_query_job
     
     influencer_data = {
@@ -69,16 +77,17 @@ def test_add_influencer_with_duplicate_handle_different_user(db_manager, mock_qu
 def test_add_influencer_same_handle_same_user(db_manager, mock_query_job):
     # Setup
     class MockResult:
-        def __init__(self, id, platform):
+        def __init__(self, id, platform, handle):
             self.id = id
             self.platform = platform
+            self.handle = handle
     
     user_id = 'test-id-3'
     mock_query_job.result.return_value = [
-        MockResult(user_id, 'twitter')  # Same user_id
+        MockResult(user_id, 'twitter', 'same_handle')  # Same user_id
     ]
+    mock_query_job.num_dml_affected_rows = 0  # id already exists
     db_manager.client.query.return_value = mock_query_job
-    db_manager.client.load_table_from_dataframe.return_value.result.return_value = None
     
     influencer_data = {
         'id': user_id,  # Same user_id
@@ -94,18 +103,34 @@ def test_add_influencer_same_handle_same_user(db_manager, mock_query_job):
     db_manager.add_influencer(influencer_data)  # Should not raise exception
     
     # Verify
-    assert db_manager.client.load_table_from_dataframe.called
+    assert 'MERGE' in db_manager.client.query.call_args_list[0][0][0]
 
-def test_update_handles_with_duplicate_in_other_account(db_manager, mock_query_job):
+def test_add_influencers_uses_single_merge(db_manager, mock_query_job):
     # Setup
-    class MockResult:
-        def __init__(self, id, platform):
-            self.id = id
-            self.platform = platform
+    mock_query_job.num_dml_affected_rows = 2
+    db_manager.client.query.return_value = mock_query_job
     
-    mock_query_job.result.return_value = [
-        MockResult('other-id', 'instagram')  # Handle exists in another account
+    influencers = [
+        {'id': 'test-id-6', 'name': 'Test User 6', 'twitter_handle': 'user6'},
+        {'id': 'test-id-7', 'name': 'Test User 7', 'twitter_handle': 'user7'}
     ]
+    
+    # Execute
+    db_manager.add_influencers(influencers)
+    
+    # Verify
+    assert db_manager.client.query.call_count == 1
+    param = db_manager.client.query.call_args[1]['job_config'].query_parameters[0]
+    assert [struct.struct_values['id'] for struct in param.values] == ['test-id-6', 'test-id-7']
+    assert param.values[0].struct_values['twitter_handle'] == 'user6'
+    assert param.values[0].struct_values['active'] is True
+
+def test_update_handles_with_duplicate_in_other_account(db_manager, mock_query_job):
+    # Setup
+    # The script's RAISE surfaces as a query error
+    mock_query_job.result.side_effect = BadRequest(
+        "Handle(s) already exist in other accounts: instagram (duplicate_handle) at [9:25]"
+    )
     db_manager.client.query.return_value = mock_query_job
     
     updates = {
@@ -116,7 +141,7 @@ def test_update_handles_with_duplicate_in_other_account(db_manager, mock_query_j
     with pytest.raises(ValueError) as exc_info:
         db_manager.update_influencer_handles('test-id-4', updates)
     
-    assert "Handle(s) already exist in other accounts" in str(exc_info.value)
+    assert str(exc_info.value) == "Handle(s) already exist in other accounts: instagram (duplicate_handle)"
 
 def test_update_handles_no_duplicates(db_manager, mock_query_job):
     # Setup
@@ -132,6 +157,552 @@ def test_update_handles_no_duplicates(db_manager, mock_query_job):
     db_manager.update_influencer_handles('test-id-5', updates)
     
     # Verify
-    assert db_manager.client.query.called
-    # Should have called query twice: once for duplicate check, once for update
-    assert db_manager.client.query.call_count == 2
\ No newline at end of file
+    # Duplicate check and update run as a single script
+    assert db_manager.client.query.call_count == 1
+    script = db_manager.client.query.call_args[0][0]
+    assert 'BEGIN TRANSACTION' in script
+    assert 'RAISE USING MESSAGE' in script
+    assert 'UPDATE' in script
+
+def test_save_influencer_data_small_batch_uses_streaming_insert(db_manager):
+    # Setup
+    db_manager.client.insert_rows_json.return_value = []
+    
+    data = [{
+        'influencer_id': 'test-id-8',
+        'username': 'user8',
+        'followers': 10,
+        'following': 5,
+        'tweets': 3,
+        'favorites': 1,
+        'timestamp': datetime(2025, 1, 1)
+    }]
+    
+    # Execute
+    db_manager.save_influencer_data('twitter', data)
+    
+    # Verify
+    assert not db_manager.client.load_table_from_file.called
+    table_id, rows = db_manager.client.insert_rows_json.call_args[0]
+    assert table_id.endswith('.twitter_metrics')
+    assert rows[0]['influencer_handle'] == 'user8'
+    assert rows[0]['timestamp'] == '2025-01-01T00:00:00+00:00'
+
+def test_save_influencer_data_large_batch_loads_parquet(db_manager):
+    # Setup
+    db_manager.client.load_table_from_file.return_value.result.return_value = None
+    
+    data = [{
+        'influencer_id': f'test-id-{i}',
+        'username': f'user{i}',
+        'followers': i,
+        'timestamp': datetime(2025, 1, 1)
+    } for i in range(STREAMING_INSERT_MAX_ROWS + 1)]
+    
+    # Execute
+    db_manager.save_influencer_data('twitter', data)
+    
+    # Verify
+    assert not db_manager.client.insert_rows_json.called
+    buffer, table_id = db_manager.client.load_table_from_file.call_args[0]
+    assert table_id.endswith('.twitter_metrics')
+    buffer.seek(0)
+    table = pq.read_table(buffer)
+    assert table.num_rows == STREAMING_INSERT_MAX_ROWS + 1
+    assert table.column('influencer_handle')[0].as_py() == 'user0'
+    assert table.column('tweets').null_count == STREAMING_INSERT_MAX_ROWS + 1
+
+def test_save_influencer_data_loads_in_chunks(db_manager):
+    # Setup
+    data = [{
+        'influencer_id': f'test-id-{i}',
+        'username': f'user{i}',
+        'timestamp': datetime(2025, 1, 1)
+    } for i in range(STREAMING_INSERT_MAX_ROWS + 1)]
+    
+    # Execute
+    with patch('database.LOAD_CHUNK_SIZE', 200):
+        db_manager.save_influencer_data('twitter', data)
+    
+    # Verify
+    load = db_manager.client.load_table_from_file
+    assert load.call_count == 3
+    assert load.return_value.result.call_count == 0
+    assert db_manager.flush() == {}
+    assert load.return_value.result.call_count == 3
+    buffer = load.call_args[0][0]
+    buffer.seek(0)
+    assert pq.read_table(buffer).num_rows == STREAMING_INSERT_MAX_ROWS + 1 - 400
+
+def test_metrics_arrow_table_matches_transformed_rows(db_manager):
+    # Setup
+    now = datetime(2025, 2, 1)
+    data = [
+        {'influencer_id': 'test-id-1', 'subscribers': 10, 'timestamp': datetime(2025, 1, 1)},
+        {'influencer_id': 'test-id-2', 'total_views': 5}
+    ]
+    schema = db_manager._get_metrics_schema('youtube')
+    
+    # Execute
+    table = db_manager._metrics_arrow_table('youtube', data, now, schema)
+    expected = db_manager._to_arrow_table(db_manager._transform_rows('youtube', data, now), schema)
+    
+    # Verify
+    assert table.schema == expected.schema
+    assert table.drop(['id']).equals(expected.drop(['id']))
+    assert table.column('subscribers').to_pylist() == [10, 0]
+
+def test_bulk_uuid4_strs_are_valid_unique_uuid4():
+    ids = _bulk_uuid4_strs(1000)
+    
+    assert len(set(ids)) == 1000
+    for value in ids:
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+def test_get_active_influencers_is_cached_until_invalidated(db_manager, mock_query_job):
+    # Setup
+    mock_query_job.result.return_value = MagicMock()
+    mock_query_job.result.return_value.to_arrow.return_value = pa.table({
+        'id': ['test-id-9'],
+        'name': ['Test User 9'],
+        'twitter_handle': ['user9'],
+        'youtube_handle': [None],
+        'instagram_handle': [None],
+        'tiktok_handle': [None],
+        'facebook_handle': [None]
+    })
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    first = db_manager.get_active_influencers()
+    second = db_manager.get_active_influencers()
+    
+    # Verify
+    assert first == second == [
+        {'id': 'test-id-9', 'name': 'Test User 9', 'handles': {'twitter': 'user9'}}
+    ]
+    assert db_manager.client.query.call_count == 1
+    
+    db_manager.invalidate_influencers_cache()
+    db_manager.get_active_influencers()
+    assert db_manager.client.query.call_count == 2
+
+def test_get_platform_last_updates_uses_single_query(db_manager, mock_query_job):
+    # Setup
+    last_update = datetime(2025, 1, 1)
+    mock_query_job.result.return_value = [
+        {'id': 'test-id-10', 'last_update': last_update},
+        {'id': 'test-id-11', 'last_update': None}
+    ]
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    result = db_manager.get_platform_last_updates('twitter', ['test-id-10', 'test-id-11', 'test-id-12'])
+    
+    # Verify
+    assert result == {'test-id-10': last_update}
+    assert db_manager.client.query.call_count == 1
+
+def test_get_last_update_dates_lookback_is_cacheable(db_manager, mock_query_job):
+    # Setup
+    mock_query_job.result.return_value = []
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    db_manager.get_last_update_dates(['test-id-14'], lookback_days=30)
+    
+    # Verify
+    query = db_manager.client.query.call_args[0][0]
+    job_config = db_manager.client.query.call_args[1]['job_config']
+    since = job_config.query_parameters[-1].value
+    assert 'CURRENT_TIMESTAMP' not in query
+    assert 'social_metrics' not in query
+    assert query.count('timestamp >= @since') == len(METRICS_TABLES)
+    assert job_config.use_query_cache is True
+    assert since.tzinfo is not None and since.hour == since.minute == 0
+
+def test_get_stale_users_filters_in_query(db_manager, mock_query_job):
+    # Setup
+    mock_query_job.result.return_value = [{'id': 'test-id-16', 'handle': 'user16'}]
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    result = db_manager.get_stale_users('tiktok', days=30)
+    
+    # Verify
+    assert result == [PlatformUser('test-id-16', 'user16')]
+    query = db_manager.client.query.call_args[0][0]
+    cutoff = db_manager.client.query.call_args[1]['job_config'].query_parameters[0].value
+    assert 'last_tiktok_updated < @cutoff' in query
+    assert 29 <= (datetime.now(timezone.utc) - cutoff).days <= 30
+
+def test_update_last_platform_updates_uses_single_merge(db_manager, mock_query_job):
+    # Setup
+    db_manager.client.query.return_value = mock_query_job
+    
+    updates = [
+        ('test-id-13', datetime(2025, 1, 1, tzinfo=timezone.utc)),
+        ('test-id-14', datetime(2025, 1, 2, tzinfo=timezone.utc)),
+        ('test-id-13', datetime(2025, 1, 3, tzinfo=timezone.utc))
+    ]
+    
+    # Execute
+    db_manager.update_last_platform_updates('twitter', updates)
+    
+    # Verify
+    assert db_manager.client.query.call_count == 1
+    query = db_manager.client.query.call_args[0][0]
+    assert 'MERGE' in query
+    param = db_manager.client.query.call_args[1]['job_config'].query_parameters[0]
+    values = {
+        struct.struct_values['id']: struct.struct_values['ts']
+        for struct in param.values
+    }
+    assert values == {
+        'test-id-13': datetime(2025, 1, 3, tzinfo=timezone.utc),
+        'test-id-14': datetime(2025, 1, 2, tzinfo=timezone.utc)
+    }
+
+def test_update_last_platform_update_goes_through_merge(db_manager, mock_query_job):
+    # Setup
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    db_manager.update_last_platform_update(
+        'youtube', 'test-id-15', datetime(2025, 1, 1, tzinfo=timezone.utc)
+    )
+    
+    # Verify
+    assert db_manager.client.query.call_count == 1
+    assert 'MERGE' in db_manager.client.query.call_args[0][0]
+
+def test_proto_rows_mirror_metrics_schema(db_manager):
+    schema = db_manager._get_metrics_schema('twitter')
+    row_class = DatabaseManager._proto_row_class('project.dataset.twitter_metrics', schema)
+    
+    # Execute
+    serialized = DatabaseManager._to_proto_row(row_class, {
+        'id': 'metric-1',
+        'influencer_id': 'test-id-16',
+        'influencer_handle': 'user16',
+        'followers': 10,
+        'following': None,
+        'timestamp': datetime(2025, 1, 1, tzinfo=timezone.utc),
+        'created_at': datetime(2025, 1, 1, 0, 0, 1)
+    }, schema)
+    
+    # Verify
+    message = row_class.FromString(serialized)
+    assert message.influencer_handle == 'user16'
+    assert message.followers == 10
+    assert not message.HasField('following')
+    assert message.timestamp == 1735689600 * 1_000_000
+    assert message.created_at == 1735689601 * 1_000_000
+
+def test_get_platform_last_updates_reuses_result_until_updated(db_manager, mock_query_job):
+    # Setup
+    mock_query_job.result.return_value = [
+        {'id': 'test-id-17', 'last_update': datetime(2025, 1, 1)}
+    ]
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    first = db_manager.get_platform_last_updates('twitter', ['test-id-17', 'test-id-18'])
+    second = db_manager.get_platform_last_updates('twitter', ['test-id-18', 'test-id-17'])
+    
+    # Verify
+    assert first == second == {'test-id-17': datetime(2025, 1, 1)}
+    assert db_manager.client.query.call_count == 1
+    
+    db_manager.update_last_platform_updates(
+        'twitter', [('test-id-18', datetime(2025, 1, 2, tzinfo=timezone.utc))]
+    )
+    db_manager.get_platform_last_updates('twitter', ['test-id-17', 'test-id-18'])
+    assert db_manager.client.query.call_count == 3
+
+def test_save_influencer_data_many_reports_failed_platforms(db_manager):
+    # Setup
+    def save(platform, data):
+        if platform == 'youtube':
+            raise RuntimeError('load failed')
+    
+    # Execute
+    with patch.object(db_manager, '_save_platform_data', side_effect=save) as mock_save:
+        failures = db_manager.save_influencer_data_many({
+            'twitter': [{'influencer_id': 'test-id-19'}],
+            'youtube': [{'influencer_id': 'test-id-20'}]
+        })
+    
+    # Verify
+    assert mock_save.call_count == 2
+    assert list(failures) == ['youtube']
+    assert str(failures['youtube']) == 'load failed'
+
+def test_save_influencer_data_async_gathers_platforms(db_manager):
+    # Setup
+    db_manager.client.insert_rows_json.return_value = []
+    data = [{'influencer_id': 'test-id-15', 'username': 'user15', 'timestamp': datetime(2025, 1, 1)}]
+    
+    # Execute
+    async def save_all():
+        await asyncio.gather(
+            db_manager.save_influencer_data_async('twitter', data),
+            db_manager.save_influencer_data_async('youtube', data)
+        )
+    asyncio.run(save_all())
+    
+    # Verify
+    tables = sorted(call[0][0].rsplit('.', 1)[1] for call in db_manager.client.insert_rows_json.call_args_list)
+    assert tables == ['twitter_metrics', 'youtube_metrics']
+
+def test_ensure_table_layout_rebuilds_only_unpartitioned_tables(db_manager, mock_query_job):
+    # Setup
+    def get_table(table_id):
+        if table_id.endswith('.twitter_metrics'):
+            return MagicMock(time_partitioning=None, clustering_fields=None)
+        if table_id.endswith('.tiktok_metrics') or table_id.endswith('_v2'):
+            raise NotFound('missing')
+        return MagicMock(time_partitioning=object(), clustering_fields=['influencer_id'])
+    db_manager.client.get_table.side_effect = get_table
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    db_manager._ensure_table_layout()
+    
+    # Verify
+    assert db_manager.client.query.call_count == 1
+    script = db_manager.client.query.call_args[0][0]
+    assert 'twitter_metrics_v2` LIKE' in script
+    assert 'PARTITION BY DATE(timestamp)' in script
+    assert 'RENAME TO `twitter_metrics`' in script
+    assert script.index('RAISE') < script.index('DROP TABLE')
+
+def test_ensure_table_layout_renames_copy_left_by_interrupted_run(db_manager, mock_query_job):
+    # Setup: twitter_metrics was dropped, but its copy was not renamed yet
+    def get_table(table_id):
+        if table_id.endswith('.twitter_metrics') or (table_id.endswith('_v2') and 'twitter' not in table_id):
+            raise NotFound('missing')
+        if table_id.endswith('.twitter_metrics_v2'):
+            return MagicMock()
+        return MagicMock(time_partitioning=object(), clustering_fields=['influencer_id'])
+    db_manager.client.get_table.side_effect = get_table
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    db_manager._ensure_table_layout()
+    
+    # Verify
+    assert db_manager.client.query.call_count == 1
+    query = db_manager.client.query.call_args[0][0]
+    assert query.startswith('ALTER TABLE')
+    assert query.endswith('.twitter_metrics_v2` RENAME TO `twitter_metrics`')
+
+def test_save_influencer_data_dev_dump_matches_written_rows(db_manager):
+    # Setup
+    db_manager.client.insert_rows_json.return_value = []
+    data = [{
+        'influencer_id': 'test-id-21',
+        'username': 'user21',
+        'followers': 10,
+        'timestamp': datetime(2025, 1, 1)
+    }]
+    
+    # Execute
+    with patch('database.Config.DEV_MODE', True), \
+            patch.object(db_manager, '_save_to_csv') as mock_dump:
+        db_manager.save_influencer_data('twitter', data)
+    
+    # Verify
+    dumped = mock_dump.call_args[0][1]
+    written = db_manager.client.insert_rows_json.call_args[0][1]
+    assert dumped[0]['id'] == written[0]['id']
+    assert dumped[0]['influencer_handle'] == 'user21'
+    assert dumped[0]['created_at'] is not None
+
+def test_save_to_csv_replaces_dump_without_leftovers(db_manager, tmp_path, monkeypatch):
+    # Setup
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(DatabaseManager, '_dev_dir_ready', False)
+    rows = [{'id': 'a', 'followers': 1}, {'id': 'b', 'followers': 2}]
+    
+    # Execute
+    db_manager._save_to_csv('twitter', rows)
+    db_manager._save_to_csv('twitter', rows[:1])
+    
+    # Verify
+    assert sorted(p.name for p in (tmp_path / 'dev_data').iterdir()) == ['twitter_metrics.parquet']
+    assert pq.read_table(tmp_path / 'dev_data' / 'twitter_metrics.parquet').num_rows == 1
+
+def test_check_existing_handles_uses_single_query(db_manager, mock_query_job):
+    # Setup
+    mock_query_job.result.return_value = [MagicMock(platform_handle='youtube_handle')]
+    db_manager.client.query.return_value = mock_query_job
+    
+    # Execute
+    duplicates = db_manager.check_existing_handles({
+        'twitter_handle': 'user22',
+        'youtube_handle': 'channel22',
+        'instagram_handle': None
+    })
+    
+    # Verify
+    assert duplicates == ['youtube (channel22)']
+    assert db_manager.client.query.call_count == 1
+    query = db_manager.client.query.call_args[0][0]
+    assert query.count('UNION ALL') == 1
+
+def test_save_metrics_use_storage_write_api_when_enabled(db_manager):
+    # Setup
+    metrics = [{
+        'influencer_id': 'test-id-23',
+        'subscribers': 100,
+        'total_views': 1000,
+        'timestamp': datetime(2025, 1, 1, tzinfo=timezone.utc)
+    }]
+    db_manager.write_client = MagicMock()
+    
+    # Execute
+    with patch.object(db_manager, '_append_rows') as mock_append:
+        db_manager.save_youtube_metrics(metrics)
+    
+    # Verify
+    table_id, rows, schema = mock_append.call_args[0]
+    assert table_id.endswith('.youtube_metrics')
+    assert rows[0]['subscribers'] == 100
+    assert not db_manager.client.load_table_from_dataframe.called
+
+def test_storage_write_api_row_class_follows_each_schema(db_manager):
+    # Setup
+    metrics = [{
+        'influencer_id': 'test-id-24',
+        'subscribers': 100,
+        'total_views': 1000,
+        'videos': 5,
+        'timestamp': datetime(2025, 1, 1, tzinfo=timezone.utc)
+    }]
+    db_manager.write_client = MagicMock()
+
+    # Execute: youtube_metrics without and then with the videos column
+    with patch('database.bigquery_storage'), patch('database.storage_writer'), \
+            patch.dict(DatabaseManager._proto_row_classes, clear=True):
+        db_manager.save_youtube_metrics(metrics)
+        db_manager.save_influencer_data('youtube', metrics)
+        row_classes = list(DatabaseManager._proto_row_classes.values())
+
+    # Verify
+    assert len(row_classes) == 2
+    assert {'videos' in row_class.DESCRIPTOR.fields_by_name for row_class in row_classes} == {True, False}
+
+def test_init_database_runs_ddl_once_per_schema_version(mock_query_job):
+    # Setup
+    client = MagicMock()
+    client.query.return_value = mock_query_job
+    
+    # Execute
+    with patch('database._ddl_done', set()):
+        init_database(client)
+        first_run = client.query.call_count
+        init_database(client)
+    
+    # Verify
+    assert first_run > 0
+    assert client.query.call_count == first_run
+
+def test_save_metrics_small_batch_uses_streaming_insert(db_manager):
+    # Setup
+    db_manager.client.insert_rows_json.return_value = []
+    metrics = [{
+        'influencer_id': 'test-id-23',
+        'subscribers': 10,
+        'timestamp': datetime(2025, 1, 1, tzinfo=timezone.utc)
+    }]
+    
+    # Execute
+    db_manager.save_youtube_metrics(metrics)
+    
+    # Verify
+    assert not db_manager.client.load_table_from_file.called
+    table_id, rows = db_manager.client.insert_rows_json.call_args[0]
+    assert table_id.endswith('.youtube_metrics')
+    assert rows[0]['subscribers'] == 10
+
+def test_save_metrics_load_job_fallback_sends_parquet(db_manager):
+    # Setup
+    metrics = [{
+        'influencer_id': 'test-id-24',
+        'username': 'user24',
+        'followers': 10,
+        'following': 5,
+        'tweets': 3,
+        'favorites': 1,
+        'timestamp': datetime(2025, 1, 1, tzinfo=timezone.utc)
+    }] * (STREAMING_INSERT_MAX_ROWS + 1)
+    
+    # Execute
+    db_manager.save_twitter_metrics(metrics)
+    
+    # Verify
+    assert not db_manager.client.load_table_from_dataframe.called
+    assert not db_manager.client.insert_rows_json.called
+    buffer, table_id = db_manager.client.load_table_from_file.call_args[0]
+    job_config = db_manager.client.load_table_from_file.call_args[1]['job_config']
+    assert table_id.endswith('.twitter_metrics')
+    assert job_config.source_format == bigquery.SourceFormat.PARQUET
+    buffer.seek(0)
+    assert pq.read_table(buffer).column('influencer_handle').to_pylist() == ['user24'] * (STREAMING_INSERT_MAX_ROWS + 1)
+
+def test_save_influencer_data_many_reports_failed_pending_loads(db_manager):
+    # Setup
+    db_manager.client.load_table_from_file.return_value.result.side_effect = RuntimeError('load failed')
+    data = [{
+        'influencer_id': f'test-id-{i}',
+        'subscribers': i,
+        'timestamp': datetime(2025, 1, 1)
+    } for i in range(STREAMING_INSERT_MAX_ROWS + 1)]
+    
+    # Execute
+    failures = db_manager.save_influencer_data_many({'youtube': data})
+    
+    # Verify
+    assert list(failures) == ['youtube']
+    assert not db_manager._pending_jobs
+
+def test_flush_reports_load_failure_waited_on_by_later_save(db_manager):
+    # Setup: the first of three load jobs fails
+    failed_job, ok_job = MagicMock(), MagicMock()
+    failed_job.result.side_effect = RuntimeError('load failed')
+    db_manager.client.load_table_from_file.side_effect = [failed_job, ok_job, ok_job]
+    data = [{
+        'influencer_id': f'test-id-{i}',
+        'subscribers': i,
+        'timestamp': datetime(2025, 1, 1)
+    } for i in range(STREAMING_INSERT_MAX_ROWS + 1)]
+
+    # Execute
+    for platform in ('youtube', 'twitter', 'instagram'):
+        db_manager.save_influencer_data(platform, data)
+    failures = db_manager.flush()
+
+    # Verify
+    assert failed_job.result.call_count == 1
+    assert list(failures) == ['youtube']
+    assert db_manager.flush() == {}
+
+def test_save_influencer_data_many_reports_earlier_load_failure_by_platform(db_manager):
+    # Setup: a failed load job left pending by an earlier youtube save
+    failed_job = MagicMock()
+    failed_job.result.side_effect = RuntimeError('load failed')
+    db_manager._pending_jobs.append(('youtube', failed_job))
+    db_manager.client.insert_rows_json.return_value = []
+    data = [{'influencer_id': 'test-id-28', 'timestamp': datetime(2025, 1, 1)}]
+
+    # Execute
+    failures = db_manager.save_influencer_data_many({
+        'twitter': data, 'instagram': data, 'tiktok': data
+    })
+
+    # Verify
+    assert list(failures) == ['youtube']
@@ -1,13 +1,22 @@
+import csv
+import itertools
 import os
-import pandas as pd
 from datetime import datetime
 import logging
 
+# Timestamp shared by every file written during this run
+SESSION_TS = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+# Keeps file names unique within a run
+_file_counter = itertools.count(1)
+
 def save_to_csv(data: dict, platform: str, username: str):
     """Save API response to CSV"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     os.makedirs('raw-data', exist_ok=True)
     
-    filename = f'raw-data/{platform}_{username}_{timestamp}.csv'
-    pd.DataFrame([data]).to_csv(filename, index=False)
+    filename = f'raw-data/{platform}_{username}_{SESSION_TS}_{next(_file_counter)}.csv'
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(data.keys()))
+        writer.writeheader()
+        writer.writerow(data)
     logging.info(f"Saved raw data to {filename}") 
\ No newline at end of file